@@ -0,0 +1,32 @@
+"""Use geography for property location
+
+Revision ID: 5d2d4f246ccb
+Revises: beda9101b7f4
+Create Date: 2026-10-18 10:02:47.391205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.models.easy_geography import EasyGeography
+from app.models.easy_geometry import EasyGeometry
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2d4f246ccb'
+down_revision = 'beda9101b7f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_index('ix_property_location', table_name='property')
+    op.alter_column('property', 'location', type_=EasyGeography(), existing_nullable=False,
+                    postgresql_using='ST_SetSRID(location, 4326)::geography(Point,4326)')
+    op.create_index('ix_property_location', 'property', ['location'], unique=False, postgresql_using='gist')
+
+
+def downgrade():
+    op.drop_index('ix_property_location', table_name='property', postgresql_using='gist')
+    op.alter_column('property', 'location', type_=EasyGeometry(), existing_nullable=False,
+                    postgresql_using='location::geometry')
+    op.create_index('ix_property_location', 'property', ['location'], unique=False)
@@ -0,0 +1,29 @@
+"""Add amenity_ids to property
+
+Revision ID: 8c41d7e0a2f9
+Revises: 5d2d4f246ccb
+Create Date: 2026-10-18 10:48:05.617342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8c41d7e0a2f9'
+down_revision = '5d2d4f246ccb'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('property', sa.Column('amenity_ids', postgresql.ARRAY(sa.Integer()), server_default='{}', nullable=False))
+    op.execute("UPDATE property SET amenity_ids = coalesce((SELECT array_agg(amenity_id) FROM propertyamenity "
+               "WHERE propertyamenity.property_id = property.id), '{}')")
+    op.create_index('ix_property_amenity_ids', 'property', ['amenity_ids'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    op.drop_index('ix_property_amenity_ids', table_name='property', postgresql_using='gin')
+    op.drop_column('property', 'amenity_ids')
@@ -0,0 +1,27 @@
+"""Add geohash to property
+
+Revision ID: a61f0b39d5c8
+Revises: e3a9c52b17d4
+Create Date: 2026-10-18 12:03:12.450917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a61f0b39d5c8'
+down_revision = 'e3a9c52b17d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('property', sa.Column('geohash', sa.String(length=12, collation='C'), nullable=True))
+    op.execute("UPDATE property SET geohash = ST_GeoHash(location::geometry, 12)")
+    op.create_index(op.f('ix_property_geohash'), 'property', ['geohash'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_property_geohash'), table_name='property')
+    op.drop_column('property', 'geohash')
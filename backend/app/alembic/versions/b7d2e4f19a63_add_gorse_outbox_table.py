@@ -0,0 +1,38 @@
+"""Add gorse outbox table
+
+Revision ID: b7d2e4f19a63
+Revises: a61f0b39d5c8
+Create Date: 2026-10-18 15:41:27.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2e4f19a63'
+down_revision = 'a61f0b39d5c8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('gorseoutbox',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('action', sa.String(), nullable=False),
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_gorseoutbox_next_attempt_at_id', 'gorseoutbox', ['next_attempt_at', 'id'], unique=False)
+    op.create_index('ix_gorseoutbox_key_id', 'gorseoutbox', ['key', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_gorseoutbox_key_id', table_name='gorseoutbox')
+    op.drop_index('ix_gorseoutbox_next_attempt_at_id', table_name='gorseoutbox')
+    op.drop_table('gorseoutbox')
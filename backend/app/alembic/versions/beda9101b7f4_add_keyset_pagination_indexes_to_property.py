@@ -0,0 +1,26 @@
+"""Add keyset pagination indexes to property
+
+Revision ID: beda9101b7f4
+Revises: 2002d6789074
+Create Date: 2026-10-18 09:12:31.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'beda9101b7f4'
+down_revision = '2002d6789074'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_property_created_at_id', 'property', ['created_at', 'id'], unique=False)
+    op.create_index('ix_property_price_id', 'property', ['price', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_property_price_id', table_name='property')
+    op.drop_index('ix_property_created_at_id', table_name='property')
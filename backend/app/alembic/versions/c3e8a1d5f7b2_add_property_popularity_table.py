@@ -0,0 +1,35 @@
+"""Add property popularity table
+
+Revision ID: c3e8a1d5f7b2
+Revises: b7d2e4f19a63
+Create Date: 2026-10-18 17:12:03.528341
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8a1d5f7b2'
+down_revision = 'b7d2e4f19a63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('propertypopularity',
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('property_category_id', sa.Integer(), nullable=True),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['property_id'], ['property.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('property_id')
+    )
+    op.create_index('ix_propertypopularity_score', 'propertypopularity', ['score'], unique=False)
+    op.create_index('ix_propertypopularity_property_category_id_score', 'propertypopularity',
+                    ['property_category_id', 'score'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_propertypopularity_property_category_id_score', table_name='propertypopularity')
+    op.drop_index('ix_propertypopularity_score', table_name='propertypopularity')
+    op.drop_table('propertypopularity')
@@ -0,0 +1,29 @@
+"""Add failed_at to gorse outbox
+
+Revision ID: d5f1b8c2e4a7
+Revises: c3e8a1d5f7b2
+Create Date: 2026-10-18 19:04:51.730264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f1b8c2e4a7'
+down_revision = 'c3e8a1d5f7b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('gorseoutbox', sa.Column('failed_at', sa.DateTime(), nullable=True))
+    op.drop_index('ix_gorseoutbox_next_attempt_at_id', table_name='gorseoutbox')
+    op.create_index('ix_gorseoutbox_next_attempt_at_id', 'gorseoutbox', ['next_attempt_at', 'id'], unique=False,
+                    postgresql_where=sa.text('failed_at IS NULL'))
+
+
+def downgrade():
+    op.drop_index('ix_gorseoutbox_next_attempt_at_id', table_name='gorseoutbox')
+    op.create_index('ix_gorseoutbox_next_attempt_at_id', 'gorseoutbox', ['next_attempt_at', 'id'], unique=False)
+    op.drop_column('gorseoutbox', 'failed_at')
@@ -0,0 +1,29 @@
+"""Add trigram indexes to property
+
+Revision ID: e3a9c52b17d4
+Revises: 8c41d7e0a2f9
+Create Date: 2026-10-18 11:21:39.884120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a9c52b17d4'
+down_revision = '8c41d7e0a2f9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_property_title_trgm', 'property', ['title'], unique=False, postgresql_using='gin',
+                    postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_property_location_name_trgm', 'property', ['location_name'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'location_name': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_property_location_name_trgm', table_name='property')
+    op.drop_index('ix_property_title_trgm', table_name='property')
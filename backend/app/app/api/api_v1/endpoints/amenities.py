@@ -1,10 +1,10 @@
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Form, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Form, File, UploadFile, Request, Response
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
-from app.api import deps
+from app.api import conditional, deps
 from app.core.storage import upload_file
 
 router = APIRouter()
@@ -12,6 +12,8 @@ router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Amenity])
 def read_amenities(
+    request: Request,
+    response: Response,
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
@@ -19,7 +21,16 @@ def read_amenities(
 ) -> Any:
     """
     Retrieve amenities.
+
+    Answers with 304 when the If-None-Match header shows that the page did not change. No Last-Modified is
+    sent, as removing an item from the page leaves no modification time.
     """
+    ids, last_modified = crud.amenity.get_multi_version(db, skip=skip, limit=limit, order=models.Amenity.title)
+    headers = conditional.get_validators((ids, last_modified))
+    response.headers.update(headers)
+    if conditional.is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
     items = crud.amenity.get_multi(db, skip=skip, limit=limit, order=models.Amenity.title)
     return items
 
@@ -1,41 +1,58 @@
 import datetime
 import uuid
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 import starlette.status
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Body, Query
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Body, Query, Request, Response
 from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
-from app.api import deps
+from app.api import conditional, deps
+from app.core import export, serialization
+from app.core.config import settings
+from app.core.serialization import FastJSONResponse
 
 from app.core.storage import upload_file
 from app.schemas.geometry import Geometry, Coordinates
 
-from app.recommend import gorse
+from app.recommend import cache as recommend_cache
+from app.recommend import popularity
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[schemas.Property])
+@router.get("/", response_model=List[schemas.PropertySummary], response_model_exclude_unset=True)
 def read_properties(
+        response: Response,
         db: Session = Depends(deps.get_db),
         skip: int = 0,
         limit: int = 100,
+        cursor: Optional[str] = Query(None, title="Cursor from the X-Next-Cursor header of the previous page, "
+                                                  "used instead of skip"),
         current_user: models.User = Depends(deps.get_current_active_user),
         filters: schemas.PropertyFilter = Depends(schemas.PropertyFilter),
         sort: Optional[str] = Query("-time", title="The field to sort with", enum=["-time", "time", "-price", "price",
-                                                                                            "-distance", "distance"]),
+                                                                                            "-distance", "distance",
+                                                                                            "relevance"]),
         sort_latitude: Optional[float] = Query(None, title="The latitude from which to calculate distance when sorting by distance", example="42.1",
                                                ge=-90, le=90),
         sort_longitude: Optional[float] = Query(None, title="The longitude from which to calculate distance when sorting by distance", example="20.4",
-                                                ge=-180, le=180)
-
+                                                ge=-180, le=180),
+        expand: Set[str] = Depends(deps.get_property_expand),
+        count: bool = Query(False, title="Include the number of matching properties in the X-Total-Count header"),
 ) -> Any:
     """
     Retrieve properties.
+
+    When a page is full, the X-Next-Cursor header holds the cursor of the next page.
+    When sort_latitude and sort_longitude are given, each property includes its distance_km from them.
+    The owner, category, amenities and photos of each property are only included when named in expand.
+    When count is set, the X-Total-Count header holds the number of matching properties. It is estimated for
+    broad filters, as told by the X-Total-Count-Exact header.
     """
     if sort:
         if "distance" in sort:
@@ -43,139 +60,263 @@ def read_properties(
                 raise HTTPException(status_code=400, detail=["Query parameter sort_latitude must be specified when sorting by distance"])
             if sort_longitude is None:
                 raise HTTPException(status_code=400, detail=["Query parameter sort_longitude must be specified when sorting by distance"])
+        if sort == "relevance" and not filters.q:
+            raise HTTPException(status_code=400, detail=["Query parameter q must be specified when sorting by relevance"])
+
+    after = None
+    if cursor:
+        after = schemas.PropertyCursor.decode(cursor)
+        if after.sort != sort:
+            raise HTTPException(status_code=400, detail=["Query parameter sort must match the sort of the cursor"])
+
+    properties = crud.property.get_multi_cached(db=db, skip=skip, limit=limit, user_id=current_user.id, filters=filters,
+                                                sort=sort, sort_latitude=sort_latitude, sort_longitude=sort_longitude,
+                                                cursor=after, expand=expand)
+    headers = dict()
+    if sort and properties and len(properties) == limit:
+        headers["X-Next-Cursor"] = crud.property.get_cursor(properties[-1], sort).encode()
+    if count:
+        total, exact = crud.property.get_total(db=db, filters=filters)
+        headers["X-Total-Count"] = str(total)
+        headers["X-Total-Count-Exact"] = str(exact).lower()
+    response.headers.update(headers)
+    return summarize(properties, expand, headers=headers)
+
+
+@router.get("/facets", response_model=schemas.PropertyFacets)
+def read_property_facets(
+        db: Session = Depends(deps.get_db),
+        current_user: models.User = Depends(deps.get_current_active_user),
+        filters: schemas.PropertyFilter = Depends(schemas.PropertyFilter),
+        price_bucket_size: float = Query(5000, title="Size of the price buckets", gt=0),
+        approximate: bool = Query(False, title="Estimate the counts from a sample of the properties, for broad filters"),
+) -> Any:
+    """
+    Count the properties matching the filters per category, amenity, number of bedrooms, number of bathrooms and
+    price bucket.
+    """
+    sample_percent = settings.PROPERTY_FACETS_SAMPLE_PERCENT if approximate else None
+    return crud.property.get_facets(db=db, filters=filters, price_bucket_size=price_bucket_size,
+                                    sample_percent=sample_percent)
+
 
-    properties = crud.property.get_multi(db=db, skip=skip, limit=limit, user_id=current_user.id, filters=filters, sort=sort,
-                                         sort_latitude=sort_latitude, sort_longitude=sort_longitude)
+@router.get("/map", response_model=List[schemas.PropertyPin])
+def read_property_pins(
+        db: Session = Depends(deps.get_db),
+        limit: int = Query(500, ge=1, le=2000),
+        current_user: models.User = Depends(deps.get_current_active_user),
+        filters: schemas.PropertyFilter = Depends(schemas.PropertyFilter),
+) -> Any:
+    """
+    Retrieve the properties in the map viewport given by bbox as pins, with the other filters applied.
+    """
+    if not filters.bbox:
+        raise HTTPException(status_code=400, detail=["Query parameter bbox must be specified"])
+    return crud.property.get_pins(db=db, filters=filters, limit=limit)
+
+
+@router.get("/clusters", response_model=List[schemas.PropertyCluster])
+def read_property_clusters(
+        db: Session = Depends(deps.get_db),
+        zoom: int = Query(..., title="Zoom level of the map", ge=0, le=22),
+        current_user: models.User = Depends(deps.get_current_active_user),
+        filters: schemas.PropertyFilter = Depends(schemas.PropertyFilter),
+) -> Any:
+    """
+    Retrieve the properties in the map viewport given by bbox aggregated into clusters for the zoom level,
+    with the other filters applied.
+    """
+    if not filters.bbox:
+        raise HTTPException(status_code=400, detail=["Query parameter bbox must be specified"])
+    return crud.property.get_clusters(db=db, filters=filters, zoom=zoom)
+
+
+@router.get("/suggest", response_model=List[schemas.PropertySuggestion])
+def read_property_suggestions(
+        db: Session = Depends(deps.get_db),
+        q: str = Query(..., title="Partial location name or title", min_length=2),
+        limit: int = Query(10, ge=1, le=50),
+        current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Suggest location names and titles matching a partial, possibly misspelled, query.
+    """
+    return crud.property.get_suggestions(db=db, q=q, limit=limit)
+
+
+@router.get("/batch", response_model=List[schemas.Property])
+def read_property_batch(
+        db: Session = Depends(deps.get_db),
+        ids: str = Query(..., title="Comma separated IDs of the properties", example="1,2,3"),
+        current_user: models.User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Get the properties with the given IDs, in the order of the IDs. IDs that are not found are skipped.
+    """
+    try:
+        property_ids = [int(id) for id in ids.split(",") if id.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=["Query parameter ids must be a comma separated list of integers"])
+    if len(property_ids) > settings.PROPERTY_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=starlette.status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=[f"Query parameter ids must have at most {settings.PROPERTY_BATCH_MAX_SIZE} IDs"])
+    properties = crud.property.get_many_ordered(db=db, ids=property_ids, user_id=current_user.id,
+                                                enabled_only=False)
+    if settings.FAST_SERIALIZATION_ENABLED:
+        extract = serialization.get_extractor(schemas.Property)
+        return FastJSONResponse([extract(property) for property in properties])
     return properties
 
 
-@router.get("/me/", response_model=List[schemas.Property])
+@router.get("/export", response_class=StreamingResponse)
+def export_properties(
+        db: Session = Depends(deps.get_db),
+        format: str = Query("ndjson", enum=["ndjson", "csv"]),
+        current_user: models.User = Depends(deps.get_current_active_superuser),
+        filters: schemas.PropertyFilter = Depends(schemas.PropertyFilter),
+) -> Any:
+    """
+    Export the properties matching the filters as newline delimited JSON or CSV, streamed as they are read.
+    """
+    rows = crud.property.iter_export(db=db, filters=filters)
+    if format == "csv":
+        content, media_type = export.to_csv(rows, crud.property.export_fields), "text/csv"
+    else:
+        content, media_type = export.to_ndjson(rows), "application/x-ndjson"
+    return StreamingResponse(content, media_type=media_type,
+                             headers={"Content-Disposition": f"attachment; filename=properties.{format}"})
+
+
+@router.get("/me/", response_model=List[schemas.PropertySummary], response_model_exclude_unset=True)
 def read_my_properties(
         db: Session = Depends(deps.get_db),
         skip: int = 0,
         limit: int = 100,
+        expand: Set[str] = Depends(deps.get_property_expand),
         current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve properties by logged in user.
     """
     properties = crud.property.get_multi_by_owner(
-        db=db, owner_id=current_user.id, skip=skip, limit=limit
+        db=db, owner_id=current_user.id, skip=skip, limit=limit, expand=expand
     )
-    return properties
+    return summarize(properties, expand)
 
 
-@router.get("/favorites/", response_model=List[schemas.Property], tags=["favorites"])
+@router.get("/favorites/", response_model=List[schemas.PropertySummary], response_model_exclude_unset=True, tags=["favorites"])
 def read_favorite_properties(
         db: Session = Depends(deps.get_db),
         skip: int = 0,
         limit: int = 100,
+        expand: Set[str] = Depends(deps.get_property_expand),
         current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve favorite properties by logged in user.
     """
     properties = crud.property.get_favorite_by_owner(
-        db=db, owner_id=current_user.id, skip=skip, limit=limit
+        db=db, owner_id=current_user.id, skip=skip, limit=limit, expand=expand
     )
-    return properties
+    return summarize(properties, expand)
 
 
-@router.get("/latest", response_model=List[schemas.Property], tags=["recommendations"])
-def read_latest_properties(
+@router.get("/latest", response_model=List[schemas.PropertySummary], response_model_exclude_unset=True,
+            tags=["recommendations"])
+async def read_latest_properties(
         category: Optional[int] = None,
         db: Session = Depends(deps.get_db),
         skip: int = 0,
         limit: int = 100,
+        expand: Set[str] = Depends(deps.get_property_expand),
         current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve the latest properties
     """
-    latest = gorse.get_latest_items(category=category, skip=skip, limit=limit)
+    latest = await recommend_cache.get_latest_items(category=category, skip=skip, limit=limit)
     # If recommendations were generated
     if latest and (len(latest) > 0):
-        # Sort by score in descending order
-        latest.sort(key=get_score, reverse=True)
-        properties = list()
-        for neighbor in latest:
-            property_get = crud.property.get(db=db, id=int(neighbor["Id"]), user_id=current_user.id)
-            if property_get:
-                properties.append(property_get)
+        properties = await run_in_threadpool(crud.property.get_many_ordered, db=db, ids=get_item_ids(latest),
+                                             user_id=current_user.id, expand=expand)
     # If no recommendations were generated
     else:
-        properties = crud.property.get_multi(db=db,
+        properties = await run_in_threadpool(crud.property.get_multi,
+                                             db=db,
                                              skip=skip,
                                              limit=limit,
-                                             user_id=current_user.id)
-    return properties
+                                             user_id=current_user.id,
+                                             expand=expand)
+    return await run_in_threadpool(encode_summaries, properties, expand)
 
 
-@router.get("/popular", response_model=List[schemas.Property], tags=["recommendations"])
-def read_popular_properties(
+@router.get("/popular", response_model=List[schemas.PropertySummary], response_model_exclude_unset=True,
+            tags=["recommendations"])
+async def read_popular_properties(
         category: Optional[int] = None,
         db: Session = Depends(deps.get_db),
         skip: int = 0,
         limit: int = 100,
+        expand: Set[str] = Depends(deps.get_property_expand),
         current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve the popular properties
     """
-    popular = gorse.get_popular_items(category=category, skip=skip, limit=limit)
-    # If recommendations were generated
-    if popular and (len(popular) > 0):
-        # Sort by score in descending order
-        popular.sort(key=get_score, reverse=True)
-        properties = list()
-        for neighbor in popular:
-            property_get = crud.property.get(db=db, id=int(neighbor["Id"]), user_id=current_user.id)
-            if property_get:
-                properties.append(property_get)
+    popular_ids = None
+    if settings.POPULAR_SOURCE == "gorse":
+        popular = await recommend_cache.get_popular_items(category=category, skip=skip, limit=limit)
+        if popular and (len(popular) > 0):
+            popular_ids = get_item_ids(popular)
+    # If Gorse is not used or generated no recommendations
+    if not popular_ids:
+        popular_ids = await run_in_threadpool(popularity.get_popular_ids, db=db, category=category, skip=skip,
+                                              limit=limit)
+    # If popular properties were found
+    if popular_ids:
+        properties = await run_in_threadpool(crud.property.get_many_ordered, db=db, ids=popular_ids,
+                                             user_id=current_user.id, expand=expand)
     # If no recommendations were generated
     else:
-        properties = crud.property.get_multi(db=db,
+        properties = await run_in_threadpool(crud.property.get_multi,
+                                             db=db,
                                              skip=skip,
                                              limit=limit,
-                                             user_id=current_user.id)
-    return properties
+                                             user_id=current_user.id,
+                                             expand=expand)
+    return await run_in_threadpool(encode_summaries, properties, expand)
 
 
-@router.get("/recommended", response_model=List[schemas.Property], tags=["recommendations"])
-def read_recommended_properties(
+@router.get("/recommended", response_model=List[schemas.PropertySummary], response_model_exclude_unset=True,
+            tags=["recommendations"])
+async def read_recommended_properties(
         category: Optional[int] = None,
         db: Session = Depends(deps.get_db),
         skip: int = 0,
         limit: int = 100,
+        expand: Set[str] = Depends(deps.get_property_expand),
         current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve properties recommended for the logged in user
     """
-    recommended = gorse.get_recommended_items(user_id=current_user.id, category=category, skip=skip, limit=limit)
+    recommended = await recommend_cache.get_recommended_items(user_id=current_user.id, category=category, skip=skip,
+                                                            limit=limit)
     if (not recommended) or (len(recommended) == 0):
-        recommended = gorse.get_latest_items(category=category, skip=skip, limit=limit)
+        recommended = await recommend_cache.get_latest_items(category=category, skip=skip, limit=limit)
     # If recommendations were generated
     if recommended and (len(recommended) > 0):
-        if isinstance(recommended[0], dict):
-            recommended.sort(key=get_score, reverse=True)
-        # Sort by score in descending order
-        properties = list()
-        for neighbor in recommended:
-            if isinstance(neighbor, str):
-                neighbor_id = int(neighbor)
-            else:
-                neighbor_id = int(neighbor["Id"])
-            property_get = crud.property.get(db=db, id=neighbor_id, user_id=current_user.id)
-            if property_get:
-                properties.append(property_get)
+        properties = await run_in_threadpool(crud.property.get_many_ordered, db=db, ids=get_item_ids(recommended),
+                                             user_id=current_user.id, expand=expand)
     # If no recommendations were generated
     else:
-        properties = crud.property.get_multi(db=db,
+        properties = await run_in_threadpool(crud.property.get_multi,
+                                             db=db,
                                              skip=skip,
                                              limit=limit,
-                                             user_id=current_user.id)
-    return properties
+                                             user_id=current_user.id,
+                                             expand=expand)
+    return await run_in_threadpool(encode_summaries, properties, expand)
 
 
 @router.post("/", response_model=schemas.Property)
@@ -212,13 +353,8 @@ def create_property(
         raise HTTPException(status_code=404, detail="Property Category not found")
     property_in.feature_image = upload_file(feature_image, str(uuid.uuid4()), "property_feature")
     property = crud.property.create_with_owner(db=db, obj_in=property_in, owner_id=current_user.id)
+    crud.property.invalidate_search_cache()
 
-    gorse.insert_item(schemas.GorseItem(Categories=crud.property.get_categories(property),
-                                        IsHidden=(not property.is_enabled),
-                                        Comment=f"Created by {current_user.id}",
-                                        ItemId=property.id,
-                                        Labels=crud.property.get_labels(property),
-                                        Timestamp=property.created_at))
     return property
 
 
@@ -236,13 +372,8 @@ def create_property(
     if not property_category:
         raise HTTPException(status_code=404, detail="Property Category not found")
     property = crud.property.create_with_owner(db=db, obj_in=property_in, owner_id=current_user.id)
+    crud.property.invalidate_search_cache()
 
-    gorse.insert_item(schemas.GorseItem(Categories=crud.property.get_categories(property),
-                                        IsHidden=(not property.is_enabled),
-                                        Comment=f"Created by {current_user.id}",
-                                        ItemId=property.id,
-                                        Labels=crud.property.get_labels(property),
-                                        Timestamp=property.created_at))
     return property
 
 
@@ -288,29 +419,39 @@ def update_property(
     if not crud.user.is_superuser(current_user):
         property_in.is_verified = property.is_verified
     property = crud.property.update(db=db, db_obj=property, obj_in=property_in)
+    crud.property.invalidate_search_cache()
 
-    gorse.update_item(id, schemas.GorseItem(Categories=crud.property.get_categories(property),
-                                            IsHidden=(not property.is_enabled),
-                                            Comment=f"Updated by {current_user.id}",
-                                            ItemId=property.id,
-                                            Labels=crud.property.get_labels(property),
-                                            Timestamp=property.last_updated))
     return property
 
 
 @router.get("/{id}", response_model=schemas.Property)
 def read_property(
         *,
+        request: Request,
+        response: Response,
         db: Session = Depends(deps.get_db),
         id: int,
         current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get property by ID.
+
+    Answers with 304 when the If-None-Match header shows that the property did not change. No Last-Modified is
+    sent, as removing a photo or a favorite leaves no modification time.
     """
+    version = crud.property.get_version(db=db, id=id, user_id=current_user.id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Property not found")
+    headers = conditional.get_validators((id, tuple(version)))
+    response.headers.update(headers)
+    if conditional.is_not_modified(request, headers):
+        return Response(status_code=304, headers=headers)
+
     property = crud.property.get(db=db, id=id, user_id=current_user.id)
     if not property:
         raise HTTPException(status_code=404, detail="Property not found")
+    if settings.FAST_SERIALIZATION_ENABLED:
+        return FastJSONResponse(serialization.get_extractor(schemas.Property)(property), headers=headers)
     return property
 
 
@@ -330,7 +471,7 @@ def delete_property(
     if not crud.user.is_superuser(current_user) and (property.owner_id != current_user.id):
         raise HTTPException(status_code=400, detail="Not enough permissions")
     property = crud.property.remove(db=db, id=id)
-    gorse.remove_item(id)
+    crud.property.invalidate_search_cache()
     return property
 
 
@@ -366,7 +507,6 @@ def modify_property_amenities(
                 amenity = crud.property_amenity.create(db=db,
                                                        obj_in=schemas.PropertyAmenityCreate(property_id=id,
                                                                                             amenity_id=amenity_id))
-                gorse.add_category_to_item(id, amenity_id)
             amenities_return.append(amenity)
 
     if amenities.removed:
@@ -381,8 +521,10 @@ def modify_property_amenities(
             amenity = crud.property_amenity.delete_by_property_id_and_amenity_id(db=db,
                                                                                  property_id=id,
                                                                                  amenity_id=amenity_id)
-            gorse.remove_category_from_item(id, amenity_id)
 
+    if amenities.added or amenities.removed:
+        crud.property.update_amenity_ids(db=db, id=id)
+        crud.property.invalidate_search_cache()
     return amenities_return
 
 
@@ -410,15 +552,9 @@ def add_favorite(
     favorite = crud.favorite.create(db=db, obj_in=schemas.FavoriteCreate(property_id=id,
                                                                          user_id=current_user.id))
 
-    feedback_out = crud.feedback.create(db=db, obj_in=schemas.FeedbackCreate(feedback_type=schemas.feedback_type.FeedbackType.FAVORITE,
-                                                                             property_id=id,
-                                                                             user_id=current_user.id))
-
-    gorse.insert_feedback([schemas.GorseFeedback(Comment=f"Created by {current_user.id}",
-                                                 FeedbackType=feedback_out.feedback_type.lower(),
-                                                 ItemId=feedback_out.property_id,
-                                                 UserId=feedback_out.user_id,
-                                                 Timestamp=feedback_out.created_at)])
+    crud.feedback.create(db=db, obj_in=schemas.FeedbackCreate(feedback_type=schemas.feedback_type.FeedbackType.FAVORITE,
+                                                              property_id=id,
+                                                              user_id=current_user.id))
 
     return favorite
 
@@ -448,7 +584,6 @@ def remove_favorite(
                                                                property_id=id,
                                                                user_id=current_user.id)
 
-    gorse.remove_feedback(user_id=current_user.id, item_id=id, feedback_type="favorite")
     return favorite
 
 
@@ -471,11 +606,6 @@ def add_feedback(
                                                                              property_id=id,
                                                                              user_id=current_user.id))
 
-    gorse.insert_feedback([schemas.GorseFeedback(Comment=f"Created by {current_user.id}",
-                                                 FeedbackType=feedback_out.feedback_type.lower(),
-                                                 ItemId=feedback_out.property_id,
-                                                 UserId=feedback_out.user_id,
-                                                 Timestamp=feedback_out.created_at)])
     return feedback_out
 
 
@@ -532,39 +662,67 @@ def remove_property_photo(
     return property_photo
 
 
-@router.get("/{id}/similar", response_model=List[schemas.Property], tags=["recommendations"])
-def read_similar_properties(
+@router.get("/{id}/similar", response_model=List[schemas.PropertySummary], response_model_exclude_unset=True,
+            tags=["recommendations"])
+async def read_similar_properties(
         id: int,
         category: Optional[int] = None,
         db: Session = Depends(deps.get_db),
         skip: int = 0,
         limit: int = 100,
+        expand: Set[str] = Depends(deps.get_property_expand),
         current_user: models.User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve properties similar to a property
     """
-    neighbors = gorse.get_item_neighbors(item_id=id, category=category, skip=skip, limit=limit)
+    neighbors = await recommend_cache.get_item_neighbors(item_id=id, category=category, skip=skip, limit=limit)
     if (not neighbors) or (len(neighbors) == 0):
-        neighbors = gorse.get_latest_items(category=category, skip=skip, limit=limit)
+        neighbors = await recommend_cache.get_latest_items(category=category, skip=skip, limit=limit)
     # If recommendations were generated
     if neighbors and (len(neighbors) > 0):
-        # Sort by score in descending order
-        neighbors.sort(key=get_score, reverse=True)
-        properties = list()
-        for neighbor in neighbors:
-            property_get = crud.property.get(db=db, id=int(neighbor["Id"]), user_id=current_user.id)
-            if property_get:
-                properties.append(property_get)
+        properties = await run_in_threadpool(crud.property.get_many_ordered, db=db, ids=get_item_ids(neighbors),
+                                             user_id=current_user.id, expand=expand)
     # If no recommendations were generated
     else:
-        properties = crud.property.get_multi(db=db,
+        properties = await run_in_threadpool(crud.property.get_multi,
+                                             db=db,
                                              skip=skip,
                                              limit=limit,
-                                             user_id=current_user.id)
-    return properties
+                                             user_id=current_user.id,
+                                             expand=expand)
+    return await run_in_threadpool(encode_summaries, properties, expand)
+
+
+def summarize(properties: List[models.Property], expand: Set[str], headers: Optional[Dict[str, str]] = None) -> Any:
+    """
+    Summaries of the properties, encoded directly into the response when fast serialization is enabled
+    """
+    if settings.FAST_SERIALIZATION_ENABLED:
+        return FastJSONResponse(crud.property.summarize_fast(properties, expand), headers=headers)
+    return crud.property.summarize(properties, expand)
+
+
+def encode_summaries(properties: List[models.Property], expand: Set[str]) -> Response:
+    """
+    Response of the summaries of the properties, for the async endpoints to build in the threadpool, since FastAPI
+    would validate a returned list of models on the event loop
+    """
+    if settings.FAST_SERIALIZATION_ENABLED:
+        return FastJSONResponse(crud.property.summarize_fast(properties, expand))
+    return JSONResponse(jsonable_encoder(crud.property.summarize(properties, expand), exclude_unset=True))
 
 
 def get_score(elem):
     return elem["Score"]
 
+
+def get_item_ids(items: List[Any]) -> List[int]:
+    """
+    Get the property IDs from Gorse results, sorted by score in descending order when scores are given
+    """
+    if isinstance(items[0], dict):
+        items = sorted(items, key=get_score, reverse=True)
+        return [int(item["Id"]) for item in items]
+    return [int(item) for item in items]
+
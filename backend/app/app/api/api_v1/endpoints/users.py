@@ -11,8 +11,6 @@ from app.core.config import settings
 from app.utils import send_new_account_email
 from app.core.storage import upload_file
 
-from app.recommend import gorse
-
 router = APIRouter()
 
 
@@ -58,10 +56,6 @@ def create_user(
             email_to=user_in.email, username=user_in.email, password=user_in.password
         )
 
-    gorse.insert_user(schemas.GorseUser(Subscribe=list(),
-                                        Comment=f"Created by {current_user.id}",
-                                        UserId=user.id,
-                                        Labels=[user.location]))
     return user
 
 
@@ -99,10 +93,6 @@ def update_user_me(
         user_in.location = location
     user = crud.user.update(db, db_obj=current_user, obj_in=user_in)
 
-    gorse.update_user(user.id, schemas.GorseUser(Subscribe=list(),
-                                                 Comment=f"Updated by {user.id}",
-                                                 UserId=user.id,
-                                                 Labels=[user.location]))
     return user
 
 
@@ -167,10 +157,6 @@ def create_user_open(
     user_in = schemas.UserCreate(**user_in_raw)
     user = crud.user.create(db, obj_in=user_in)
 
-    gorse.insert_user(schemas.GorseUser(Subscribe=list(),
-                                        Comment=f"Created by {user.id}",
-                                        UserId=user.id,
-                                        Labels=[user.location]))
     return user
 
 
@@ -230,8 +216,4 @@ def update_user(
         user_in.is_verified = current_user.is_verified
     user = crud.user.update(db, db_obj=user, obj_in=user_in)
 
-    gorse.update_user(user.id, schemas.GorseUser(Subscribe=list(),
-                                                 Comment=f"Updated by {current_user.id}",
-                                                 UserId=user.id,
-                                                 Labels=[user.location]))
     return user
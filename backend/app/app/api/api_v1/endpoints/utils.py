@@ -6,6 +6,7 @@ from pydantic.networks import EmailStr
 from app import models, schemas
 from app.api import deps
 from app.core.celery_app import celery_app
+from app.recommend import gorse
 from app.utils import send_test_email
 
 router = APIRouter()
@@ -33,3 +34,15 @@ def test_email(
     """
     send_test_email(email_to=email_to)
     return {"msg": "Test email sent"}
+
+
+@router.get("/gorse-circuit/", response_model=schemas.GorseCircuit)
+def read_gorse_circuit(
+    current_user: models.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    State of the circuit breaker of the calls to Gorse.
+    """
+    breaker = gorse.breaker
+    return schemas.GorseCircuit(state=breaker.state.value, failures=breaker.failures,
+                                open_for=breaker.get_open_for(), last_error=breaker.last_error)
@@ -0,0 +1,51 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+
+
+def get_validators(version: Any, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """
+    ETag and Last-Modified headers of a resource from its version, which must change whenever its representation
+    does. The ETag is weak since the same version may be serialized to different bytes.
+    """
+    digest = hashlib.md5(repr(version).encode("utf-8")).hexdigest()
+    headers = {"ETag": f'W/"{digest}"', "Cache-Control": "private, no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(as_utc(last_modified).replace(microsecond=0), usegmt=True)
+    return headers
+
+
+def as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def opaque_tag(etag: str) -> str:
+    """
+    ETag without its weakness indicator, as If-None-Match uses the weak comparison
+    """
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(request: Request, headers: Dict[str, str]) -> bool:
+    """
+    Whether the copy of the client is current, from its If-None-Match header, or its If-Modified-Since header when
+    If-None-Match is not sent
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {opaque_tag(tag.strip()) for tag in if_none_match.split(",")}
+        return "*" in tags or opaque_tag(headers["ETag"]) in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and "Last-Modified" in headers:
+        try:
+            since = as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        return parsedate_to_datetime(headers["Last-Modified"]) <= since
+    return False
+
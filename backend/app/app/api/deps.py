@@ -1,6 +1,6 @@
-from typing import Generator
+from typing import Generator, Optional, Set
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
@@ -59,3 +59,20 @@ def get_current_active_superuser(
             status_code=400, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+
+def get_property_expand(
+    expand: Optional[str] = Query(None, title="Comma separated relations to include in each property",
+                                  example="owner,photos,amenities,category"),
+) -> Set[str]:
+    if not expand:
+        return set()
+    relations = {relation.strip() for relation in expand.split(",") if relation.strip()}
+    unknown = relations.difference(schemas.PropertySummary.expandable)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=[f"Query parameter expand must be a combination of "
+                    f"{', '.join(schemas.PropertySummary.expandable)}, not {', '.join(sorted(unknown))}"],
+        )
+    return relations
@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+from app.core.config import settings
+
+
+class CacheBackend(ABC):
+    """
+    Key value cache with expiring entries and version counters used to invalidate groups of entries.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def get_version(self, name: str) -> int:
+        pass
+
+    @abstractmethod
+    def bump_version(self, name: str) -> int:
+        pass
+
+
+class LRUCache(CacheBackend):
+    """
+    In-process cache that evicts the least recently used entries when full.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[str, Any]" = OrderedDict()
+        # Versions are kept apart from the entries so that they are never evicted
+        self.versions = dict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self.lock:
+            self.entries[key] = (expires_at, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def get_version(self, name: str) -> int:
+        return self.versions.get(name, 0)
+
+    def bump_version(self, name: str) -> int:
+        with self.lock:
+            self.versions[name] = self.versions.get(name, 0) + 1
+            return self.versions[name]
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache shared between workers, stored in Redis as JSON. Requires the redis package.
+    """
+
+    def __init__(self, url: str, namespace: str):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.namespace = namespace
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.client.get(f"{self.namespace}:{key}")
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.client.set(f"{self.namespace}:{key}", json.dumps(value), px=int(ttl * 1000) if ttl else None)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(f"{self.namespace}:{key}")
+
+    def get_version(self, name: str) -> int:
+        return int(self.client.get(f"{self.namespace}:version:{name}") or 0)
+
+    def bump_version(self, name: str) -> int:
+        return self.client.incr(f"{self.namespace}:version:{name}")
+
+
+def get_cache_backend(namespace: str, maxsize: int = 1024) -> CacheBackend:
+    """
+    Shared Redis cache when CACHE_REDIS_URL is set, otherwise an in-process LRU cache
+    """
+    if settings.CACHE_REDIS_URL:
+        return RedisCache(settings.CACHE_REDIS_URL, namespace=namespace)
+    return LRUCache(maxsize=maxsize)
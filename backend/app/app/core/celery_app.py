@@ -1,5 +1,15 @@
 from celery import Celery
 
+from app.core.config import settings
+
 celery_app = Celery("worker", broker="amqp://guest@queue//")
 
-celery_app.conf.task_routes = {"app.worker.test_celery": "main-queue"}
+celery_app.conf.task_routes = {"app.worker.test_celery": "main-queue",
+                               "app.worker.drain_gorse_outbox": "main-queue"}
+
+celery_app.conf.beat_schedule = {
+    "drain-gorse-outbox": {
+        "task": "app.worker.drain_gorse_outbox",
+        "schedule": settings.GORSE_OUTBOX_DRAIN_INTERVAL,
+    },
+}
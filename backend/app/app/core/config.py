@@ -1,4 +1,5 @@
 import secrets
+from datetime import datetime
 from typing import Any, Dict, List, Optional, Union
 
 from pydantic import AnyHttpUrl, BaseSettings, EmailStr, HttpUrl, PostgresDsn, validator
@@ -83,6 +84,80 @@ class Settings(BaseSettings):
     USERS_OPEN_REGISTRATION: bool = False
 
     GORSE_API_URL: str
+    GORSE_API_KEY: str = ""
+    # Seconds to wait for a connection to Gorse, and for each response once connected
+    GORSE_CONNECT_TIMEOUT: float = 1.0
+    GORSE_READ_TIMEOUT: float = 2.0
+    # Connections kept open to Gorse by each worker and client
+    GORSE_MAX_CONNECTIONS: int = 20
+    # Consecutive failed or slow calls opening the circuit to Gorse, seconds after which a call is slow, and seconds
+    # the circuit stays open before a probe
+    GORSE_BREAKER_FAILURE_THRESHOLD: int = 5
+    GORSE_BREAKER_SLOW_CALL_DURATION: float = 1.0
+    GORSE_BREAKER_RESET_TIMEOUT: float = 30
+
+    # Seconds the latest, popular and similar properties are served from cache, then served stale while refreshed
+    RECOMMEND_CACHE_TTL: float = 60
+    RECOMMEND_CACHE_STALE_TTL: float = 600
+    # Seconds the recommendations for a user are served from cache
+    RECOMMEND_USER_CACHE_TTL: float = 15
+    RECOMMEND_CACHE_SIZE: int = 1024
+
+    # Seconds between the drains of the Gorse outbox by the worker, and rows delivered per batch
+    GORSE_OUTBOX_DRAIN_INTERVAL: float = 5
+    GORSE_OUTBOX_BATCH_SIZE: int = 500
+    # Seconds before retrying rows that failed, doubled on each attempt up to the maximum
+    GORSE_OUTBOX_RETRY_DELAY: float = 5
+    GORSE_OUTBOX_MAX_RETRY_DELAY: float = 3600
+
+    # Source of the popular properties, either "gorse", falling back to the local scores when Gorse fails, or "local"
+    POPULAR_SOURCE: str = "gorse"
+
+    @validator("POPULAR_SOURCE")
+    def popular_source_is_supported(cls, v: str) -> str:
+        if v not in ("gorse", "local"):
+            raise ValueError(v)
+        return v
+
+    # Days after which the weight of a feedback in the local popularity scores is halved, and weight of each feedback
+    # type. The scores grow from the epoch and must be rebuilt, see rebuild_popularity.py, with a later epoch within
+    # about a thousand half lives, or whenever the half life or weights change.
+    POPULARITY_HALF_LIFE_DAYS: float = 7
+    POPULARITY_EPOCH: datetime = datetime(2026, 1, 1)
+    POPULARITY_WEIGHTS: Dict[str, float] = {"VIEW": 1, "CLICK": 1, "READ": 1, "MAP": 1, "TEXT": 3, "CALL": 3,
+                                            "SHARE": 3, "FAVORITE": 5}
+
+    # Strategy used to eager load the relations of properties, either "selectin" or "joined"
+    PROPERTY_LOADER_STRATEGY: str = "selectin"
+
+    @validator("PROPERTY_LOADER_STRATEGY")
+    def loader_strategy_is_supported(cls, v: str) -> str:
+        if v not in ("selectin", "joined"):
+            raise ValueError(v)
+        return v
+
+    # Redis instance shared by the workers for caching, an in-process cache is used when not set
+    CACHE_REDIS_URL: Optional[str] = None
+    PROPERTY_SEARCH_CACHE_ENABLED: bool = True
+    PROPERTY_SEARCH_CACHE_SIZE: int = 1024
+    # Seconds before cached search results expire, which bounds staleness across workers using in-process caches
+    PROPERTY_SEARCH_CACHE_TTL: int = 30
+
+    PROPERTY_SUGGEST_CACHE_SIZE: int = 4096
+    PROPERTY_SUGGEST_CACHE_TTL: int = 300
+
+    # Percentage of the properties sampled when approximating facet counts
+    PROPERTY_FACETS_SAMPLE_PERCENT: float = 10
+
+    # Largest planner estimate of the matching properties for which the total is counted exactly, above which the
+    # estimate is returned instead
+    PROPERTY_EXACT_COUNT_THRESHOLD: int = 1000
+
+    # Maximum number of properties fetched at once by ID
+    PROPERTY_BATCH_MAX_SIZE: int = 50
+
+    # Build the responses of the property read endpoints directly from the loaded rows, skipping their validation
+    FAST_SERIALIZATION_ENABLED: bool = False
 
     class Config:
         case_sensitive = True
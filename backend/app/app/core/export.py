@@ -0,0 +1,47 @@
+import csv
+import io
+from typing import Any, Dict, Iterable, Iterator, List
+
+from app.core import serialization
+
+# Separator of the items of list values, such as the amenity IDs, within a CSV cell
+CSV_LIST_DELIMITER = ";"
+
+
+def to_ndjson(rows: Iterable[Dict[str, Any]], batch_size: int = 1000) -> Iterator[bytes]:
+    """
+    Encode rows as newline delimited JSON, in chunks of `batch_size` rows
+    """
+    chunk: List[bytes] = list()
+    for row in rows:
+        chunk.append(serialization.dumps(row))
+        if len(chunk) == batch_size:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = list()
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+
+def to_csv(rows: Iterable[Dict[str, Any]], fields: List[str], batch_size: int = 1000) -> Iterator[bytes]:
+    """
+    Encode rows as CSV with a header line, in chunks of `batch_size` rows. List values are joined with
+    CSV_LIST_DELIMITER.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    written = 0
+    for row in rows:
+        writer.writerow({field: to_cell(value) for field, value in row.items()})
+        written += 1
+        if written % batch_size == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def to_cell(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return CSV_LIST_DELIMITER.join(str(item) for item in value)
+    return value
@@ -0,0 +1,59 @@
+# Geohash encoding, as described on https://en.wikipedia.org/wiki/Geohash
+
+from typing import Tuple
+
+BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+MAX_PRECISION = 12
+
+
+def encode(latitude: float, longitude: float, precision: int = MAX_PRECISION) -> str:
+    """
+    Geohash of the coordinates with `precision` characters. Properties sharing a prefix are in the same cell.
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(geohash) < precision:
+        value, value_range = (longitude, lng_range) if even else (latitude, lat_range)
+        mid = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            value_range[0] = mid
+        else:
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(geohash)
+
+
+def is_valid(geohash: str) -> bool:
+    return 0 < len(geohash) <= MAX_PRECISION and all(char in BASE32 for char in geohash)
+
+
+def cell_size(precision: int) -> Tuple[float, float]:
+    """
+    Height and width in degrees of the cells of geohashes with `precision` characters
+    """
+    bits = 5 * precision
+    lng_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180 / (2 ** lat_bits), 360 / (2 ** lng_bits)
+
+
+def precision_for_zoom(zoom: int) -> int:
+    """
+    Smallest geohash precision with about 4 cells across each 256 pixel map tile at the zoom level
+    """
+    tile_width = 360 / (2 ** zoom)
+    for precision in range(1, MAX_PRECISION + 1):
+        if cell_size(precision)[1] <= tile_width / 4:
+            return precision
+    return MAX_PRECISION
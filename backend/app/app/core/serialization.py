@@ -0,0 +1,82 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_SINGLETON, ModelField
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+Extractor = Callable[[Any], Dict[str, Any]]
+
+
+@lru_cache(maxsize=None)
+def get_extractor(schema: Type[BaseModel], fields: Optional[FrozenSet[str]] = None) -> Extractor:
+    """
+    Function building the response dict of an ORM object directly from its attributes, with the fields of the
+    schema, or only those in `fields` when given. The values are not validated, so it must only be used with
+    objects loaded from the database, which already match the schema.
+    """
+    readers: List[Tuple[str, str, Optional[Callable[[Any], Any]]]] = list()
+    for name, field in schema.__fields__.items():
+        if fields is None or name in fields:
+            readers.append((field.alias, name, get_reader(field)))
+
+    def extract(obj: Any) -> Dict[str, Any]:
+        data = dict()
+        for alias, name, read in readers:
+            value = getattr(obj, name)
+            data[alias] = value if read is None or value is None else read(value)
+        return data
+
+    return extract
+
+
+def get_reader(field: ModelField) -> Optional[Callable[[Any], Any]]:
+    """
+    Function converting the value of a nested model field, or None when the value is used as is
+    """
+    if not (isinstance(field.type_, type) and issubclass(field.type_, BaseModel)):
+        return None
+    extract = get_extractor(field.type_)
+    if field.shape == SHAPE_SINGLETON:
+        return extract
+    return lambda values: [extract(value) for value in values]
+
+
+def default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode to JSON with orjson when it is installed, else with the standard library
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=default)
+    return json.dumps(content, default=default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response for content that is already made of JSON compatible values, such as the output of an extractor
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,7 +1,8 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.db.base_class import Base
@@ -30,10 +31,25 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self, db: Session, *, skip: int = 0, limit: int = 100, order: Optional[str] = None
     ) -> List[ModelType]:
         query = db.query(self.model)
-        if order:
-            query.order_by(order)
+        if order is not None:
+            query = query.order_by(order)
         return query.offset(skip).limit(limit).all()
 
+    def get_multi_version(
+        self, db: Session, *, skip: int = 0, limit: int = 100, order: Optional[str] = None
+    ) -> Tuple[List[Any], Optional[Any]]:
+        """
+        IDs and latest modification time of the page returned by get_multi, which change whenever the page does,
+        without loading the rows
+        """
+        modified_at = func.coalesce(self.model.last_updated, self.model.created_at)
+        page = db.query(self.model.id.label("id"), modified_at.label("modified_at"))
+        if order is not None:
+            page = page.order_by(order)
+        page = page.offset(skip).limit(limit).subquery()
+        ids, last_modified = db.query(func.array_agg(page.c.id), func.max(page.c.modified_at)).one()
+        return ids or [], last_modified
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)  # type: ignore
@@ -1,29 +1,142 @@
-from typing import List, Any, Optional
+import hashlib
+import json
+import re
+from typing import List, Any, Iterator, Optional, Union, Dict, Set, Tuple
 
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import cast
-from shapely.geometry import Point
-from geoalchemy2 import func, WKTElement, Geography
-from geoalchemy2.shape import from_shape
-from geoalchemy2.types import Geography
+from sqlalchemy.orm import Session, selectinload, joinedload
+from sqlalchemy import Float, case, cast, func, literal, select, tablesample, tuple_, union_all
+from sqlalchemy.sql.expression import exists
 
+from app.core.cache import get_cache_backend, LRUCache
+from app.core import geohash, serialization
+from app.core.config import settings
 from app.crud.base import CRUDBase
+from app.db.explain import estimate_rows
 from app.models.property import Property
 from app.models.favorite import Favorite
 from app import schemas
 
-from app.models import PropertyCategory
+from app.models import Amenity, PropertyCategory, User
 
 from app.models import PropertyAmenity
+from app.models import PropertyPhoto
+from app.models import EasyGeography
+
+# Cache of the IDs matching property searches, invalidated by bumping the "properties" version
+search_cache = get_cache_backend("property_search", maxsize=settings.PROPERTY_SEARCH_CACHE_SIZE)
+# In-process cache of the suggestions for the most requested prefixes
+suggest_cache = LRUCache(maxsize=settings.PROPERTY_SUGGEST_CACHE_SIZE)
 
 
 class CRUDProperty(CRUDBase[Property, schemas.PropertyCreate, schemas.PropertyUpdate]):
 
-    def get(self, db: Session, id: Any, user_id: int) -> Optional[Property]:
-        query = db.query(Property).filter(Property.id == id)
-        query.outerjoin(Favorite, ((Property.id == Favorite.property_id) & (Favorite.user_id == user_id)))
-        return query.first()
+    def get_loader_options(self, loader_strategy: Optional[str] = None,
+                           expand: Optional[Set[str]] = None) -> List[Any]:
+        """
+        Eager loading options for the relations serialized by schemas.Property, so that a page of properties
+        costs a constant number of queries instead of lazy loading the relations of each row.
+        When `expand` is given, only the relations named in it are loaded.
+        """
+        loader_strategy = loader_strategy or settings.PROPERTY_LOADER_STRATEGY
+        load = joinedload if loader_strategy == "joined" else selectinload
+        options = {"owner": [load(Property.owner)],
+                   "category": [load(Property.property_category)],
+                   "amenities": [load(Property.property_amenities).joinedload(PropertyAmenity.amenity)],
+                   "photos": [load(Property.property_photos)]}
+        if expand is None:
+            expand = set(options)
+        return [option for relation in options if relation in expand for option in options[relation]]
+
+    def summarize(self, properties: List[Property], expand: Set[str]) -> List[schemas.PropertySummary]:
+        """
+        Summaries of the properties, with only the relations named in `expand` set. The other relations are not
+        accessed, so they are never lazy loaded.
+        """
+        fields = schemas.PropertySummary.get_fields(expand)
+        return [schemas.PropertySummary(**{field: getattr(property, field) for field in fields})
+                for property in properties]
+
+    def summarize_fast(self, properties: List[Property], expand: Set[str]) -> List[Dict[str, Any]]:
+        """
+        Same as summarize, but builds the response dicts directly without validating them
+        """
+        extract = serialization.get_extractor(schemas.PropertySummary, schemas.PropertySummary.get_fields(expand))
+        return [extract(property) for property in properties]
+
+    def favorite_exists(self, user_id: int) -> Any:
+        """
+        Column expression that is true when the property is a favorite of the given user
+        """
+        return exists().where((Favorite.property_id == Property.id) & (Favorite.user_id == user_id))\
+            .label("is_favorite")
+
+    def set_row_attributes(self, rows: List[Any]) -> List[Property]:
+        """
+        Set the labelled columns of rows of (Property, is_favorite, ...) as attributes of the property
+        """
+        properties = list()
+        for row in rows:
+            property = row[0]
+            for key, value in row._asdict().items():
+                if value is not property:
+                    setattr(property, key, value)
+            properties.append(property)
+        return properties
+
+    def get(self, db: Session, id: Any, user_id: int, loader_strategy: Optional[str] = None,
+            expand: Optional[Set[str]] = None) -> Optional[Property]:
+        query = db.query(Property, self.favorite_exists(user_id)).filter(Property.id == id)\
+            .options(*self.get_loader_options(loader_strategy, expand))
+        row = query.first()
+        if not row:
+            return None
+        return self.set_row_attributes([row])[0]
+
+    def get_version(self, db: Session, *, id: Any, user_id: int) -> Optional[Any]:
+        """
+        Version of the property as returned by get for the user, without loading it. The row changes whenever the
+        property, its owner, category, photos, amenities or whether it is a favorite of the user change, though its
+        latest modification time alone does not change when photos, amenities or the favorite are removed.
+        """
+        def modified_at(model: Any) -> Any:
+            return func.coalesce(model.last_updated, model.created_at)
+
+        photos = PropertyPhoto.property_id == Property.id
+        amenities = PropertyAmenity.property_id == Property.id
+        amenities_table = PropertyAmenity.__table__.join(Amenity.__table__)
+        photos_modified_at = select([func.max(modified_at(PropertyPhoto))]).where(photos).as_scalar()
+        amenities_modified_at = select([func.max(func.greatest(modified_at(PropertyAmenity), modified_at(Amenity)))])\
+            .select_from(amenities_table).where(amenities).as_scalar()
+        return db.query(func.greatest(modified_at(Property), modified_at(User), modified_at(PropertyCategory),
+                                      photos_modified_at, amenities_modified_at).label("last_modified"),
+                        select([func.count()]).where(photos).as_scalar().label("photos"),
+                        select([func.count()]).select_from(amenities_table).where(amenities).as_scalar()
+                        .label("amenities"),
+                        self.favorite_exists(user_id))\
+            .select_from(Property).outerjoin(Property.owner).outerjoin(Property.property_category)\
+            .filter(Property.id == id).first()
+
+    def get_many_ordered(self, db: Session, *, ids: List[int], user_id: int, enabled_only: bool = True,
+                         loader_strategy: Optional[str] = None,
+                         expand: Optional[Set[str]] = None) -> List[Property]:
+        """
+        Fetch the properties with the given IDs in a single query, returned in the order of `ids`.
+        IDs that do not exist, or are disabled when `enabled_only` is set, are dropped.
+        """
+        if not ids:
+            return []
+        query = db.query(Property, self.favorite_exists(user_id)).filter(Property.id.in_(ids))
+        if enabled_only:
+            query = query.filter(Property.is_enabled == True)
+        query = query.options(*self.get_loader_options(loader_strategy, expand))
+        properties = {property.id: property for property in self.set_row_attributes(query.all())}
+        ordered = list()
+        for id in ids:
+            property = properties.pop(id, None)
+            if property:
+                ordered.append(property)
+        return ordered
 
     def get_multi(
             self, db: Session, *, skip: int = 0, limit: int = 100, user_id: int,
@@ -31,22 +144,51 @@ class CRUDProperty(CRUDBase[Property, schemas.PropertyCreate, schemas.PropertyUp
             filters: Optional[schemas.PropertyFilter] = None,
             sort: Optional[str] = "-time",
             sort_latitude: Optional[float] = None,
-            sort_longitude: Optional[float] = None
+            sort_longitude: Optional[float] = None,
+            cursor: Optional[schemas.PropertyCursor] = None,
+            loader_strategy: Optional[str] = None,
+            expand: Optional[Set[str]] = None
     ) -> List[Property]:
-        query = db.query(Property)
+        query = db.query(Property, self.favorite_exists(user_id)).options(*self.get_loader_options(loader_strategy, expand))
         # If a list of IDs is given, filter by them
         if options and (len(options) > 0):
             query = query.filter(Property.id.in_(options))
 
+        query = self.filter_query(query, filters)
+
+        # Return the distance from the sort coordinates along with each property
+        if sort_latitude is not None and sort_longitude is not None:
+            query = query.add_columns(self.get_distance(sort_latitude, sort_longitude).label("distance"))
+
+        # Sort by appropriate field in ascending or descending order, with the ID as a tie breaker
+        sort_column = self.get_sort_column(sort, sort_latitude, sort_longitude, q=filters.q if filters else None)
+        if sort_column is not None:
+            if sort == "relevance":
+                query = query.add_columns(sort_column.label("rank"))
+            descending = sort.startswith("-") or sort == "relevance"
+            # If continuing from a cursor, seek past the last row of the previous page
+            if cursor:
+                after = tuple_(cursor.key, cursor.id)
+                if descending:
+                    query = query.filter(tuple_(sort_column, Property.id) < after)
+                else:
+                    query = query.filter(tuple_(sort_column, Property.id) > after)
+            if descending:
+                query = query.order_by(sort_column.desc(), Property.id.desc())
+            else:
+                query = query.order_by(sort_column, Property.id)
+            if cursor:
+                return self.set_row_attributes(query.limit(limit).all())
+        return self.set_row_attributes(query.offset(skip).limit(limit).all())
+
+    def filter_query(self, query: Any, filters: Optional[schemas.PropertyFilter]) -> Any:
+        """
+        Apply the property filters to a query selecting from Property
+        """
         if filters:
-            # TODO: Actual filtering by Query using SQLAlchemy-Searchable If filtering by query, perform full
+            # If filtering by query, perform full text search
             if filters.q:
-                # Remove extra spaces
-                text = filters.q.replace('  ', ' ')
-                search_text = ''
-                for word in text.split(' '):
-                    search_text = search_text.join('|').join(word)
-                query = query.filter(Property.__ts_vector__.match(filters.q))
+                query = query.filter(Property.__ts_vector__.op("@@")(self.get_ts_query(filters.q)))
 
             # If filtering by minimum number of beds
             if filters.min_bed is not None:
@@ -72,7 +214,17 @@ class CRUDProperty(CRUDBase[Property, schemas.PropertyCreate, schemas.PropertyUp
             if filters.location:
                 parts = filters.location.split(",")
                 lat, lng, radius = tuple([float(part) for part in parts])
-                query = query.filter(func.ST_DWithin(cast(Property.location, Geography), cast(from_shape(Point(lng, lat)), Geography), radius*1000))
+                query = query.filter(func.ST_DWithin(Property.location, self.get_point(lat, lng), radius*1000))
+
+            # If filtering by geohash cell, a range scan on the geohash index
+            if filters.geohash:
+                query = query.filter(Property.geohash.startswith(filters.geohash))
+
+            # If filtering by the bounding box of a map viewport
+            if filters.bbox:
+                min_lng, min_lat, max_lng, max_lat = [float(part) for part in filters.bbox.split(",")]
+                envelope = func.geography(func.ST_MakeEnvelope(min_lng, min_lat, max_lng, max_lat, 4326))
+                query = query.filter(Property.location.op("&&")(envelope))
 
             # If filtering by verified status
             if filters.is_verified is not None:
@@ -97,52 +249,354 @@ class CRUDProperty(CRUDBase[Property, schemas.PropertyCreate, schemas.PropertyUp
                     amenities = [num for num in filters.amenities.split(",")]
                 else:
                     amenities = [filters.amenities]
+                amenities = [int(num) for num in amenities]
                 if len(amenities) > 0:
-                    query = query.join(PropertyAmenity, (Property.id == PropertyAmenity.property_id))\
-                        .filter(PropertyAmenity.amenity_id.in_(amenities))
-
-        # Sort by appropriate field in ascending or descending order
-        if sort:
-            if sort == "time":
-                query = query.order_by(Property.created_at)
-            elif sort == "-time":
-                query = query.order_by(Property.created_at.desc())
-            elif sort == "price":
-                query = query.order_by(Property.price)
-            elif sort == "-price":
-                query = query.order_by(Property.price.desc())
-            elif sort == "distance" and sort_latitude is not None and sort_longitude is not None:
-                query = query.order_by(func.ST_Distance(cast(Property.location, Geography),
-                                                        cast(from_shape(Point(sort_longitude, sort_latitude)), Geography)))
-            elif sort == "-distance" and sort_latitude is not None and sort_longitude is not None:
-                query = query.order_by(func.ST_Distance(cast(Property.location, Geography),
-                                                        cast(from_shape(Point(sort_longitude, sort_latitude)), Geography)).desc())
-        query = query.outerjoin(Favorite, ((Property.id == Favorite.property_id) & (Favorite.user_id == user_id)))
-        return query.offset(skip).limit(limit).all()
+                    if filters.amenity_match == "all":
+                        query = query.filter(Property.amenity_ids.contains(amenities))
+                    else:
+                        query = query.filter(Property.amenity_ids.overlap(amenities))
+        return query
+
+    def get_pins(
+            self, db: Session, *, filters: schemas.PropertyFilter, limit: int = 500
+    ) -> List[Any]:
+        """
+        Only the columns needed to show the properties matching the filters as map pins, without loading
+        the properties or their relations
+        """
+        query = db.query(Property.id, Property.title, Property.price, Property.num_bed, Property.num_bath,
+                         Property.property_category_id, Property.location)
+        return self.filter_query(query, filters).order_by(Property.id).limit(limit).all()
+
+    def get_clusters(
+            self, db: Session, *, filters: schemas.PropertyFilter, zoom: int
+    ) -> List[schemas.PropertyCluster]:
+        """
+        Aggregate the properties matching the filters into geohash cells sized for the map zoom level, with
+        the count, centroid and minimum and median price of each cell computed in SQL
+        """
+        cell = func.substr(Property.geohash, 1, geohash.precision_for_zoom(zoom)).label("cell")
+        geometry = func.geometry(Property.location)
+        longitude = func.ST_X(geometry)
+        latitude = func.ST_Y(geometry)
+        query = db.query(cell,
+                         func.count().label("count"),
+                         func.avg(latitude).label("latitude"),
+                         func.avg(longitude).label("longitude"),
+                         func.min(Property.price).label("min_price"),
+                         func.percentile_cont(0.5).within_group(Property.price).label("median_price"),
+                         func.min(Property.id).label("property_id"))
+        # Properties without a geohash, not yet backfilled, have no cell to be shown in
+        query = self.filter_query(query, filters).filter(Property.geohash.isnot(None)).group_by(cell)
+        return [schemas.PropertyCluster(cell=row.cell, count=row.count,
+                                        latitude=row.latitude, longitude=row.longitude,
+                                        min_price=row.min_price, median_price=row.median_price,
+                                        property_id=row.property_id if row.count == 1 else None)
+                for row in query.all()]
+
+    def get_facets(
+            self, db: Session, *, filters: Optional[schemas.PropertyFilter] = None, price_bucket_size: float = 5000,
+            sample_percent: Optional[float] = None
+    ) -> schemas.PropertyFacets:
+        """
+        Count the properties matching the filters per category, amenity, number of bedrooms, number of bathrooms
+        and price bucket in a single statement. The filtered properties are scanned once and grouped with GROUPING
+        SETS, with the amenity counts unnested from the same scan.
+
+        When `sample_percent` is given, only that percentage of the table is sampled and the counts are scaled up,
+        which is much cheaper for very broad filters.
+        """
+        price_bucket = (func.floor(Property.price / price_bucket_size) * price_bucket_size).label("price_bucket")
+        query = db.query(Property.id, Property.property_category_id, Property.num_bed, Property.num_bath,
+                         Property.amenity_ids, price_bucket)
+        if sample_percent:
+            query = query.select_entity_from(tablesample(Property.__table__, func.system(sample_percent)))
+        base = self.filter_query(query, filters).cte("base")
+
+        grouped = select([
+            case([(func.grouping(base.c.property_category_id) == 0, "category"),
+                  (func.grouping(base.c.num_bed) == 0, "num_bed"),
+                  (func.grouping(base.c.num_bath) == 0, "num_bath")],
+                 else_="price").label("facet"),
+            func.coalesce(base.c.property_category_id, base.c.num_bed, base.c.num_bath,
+                          base.c.price_bucket).cast(Float).label("value"),
+            func.count().label("count")
+        ]).group_by(func.grouping_sets(base.c.property_category_id, base.c.num_bed, base.c.num_bath,
+                                       base.c.price_bucket))
+        amenity_ids = select([func.unnest(base.c.amenity_ids).label("amenity_id")]).alias("amenity_ids")
+        amenities = select([
+            literal("amenity").label("facet"),
+            amenity_ids.c.amenity_id.cast(Float).label("value"),
+            func.count().label("count")
+        ]).group_by(amenity_ids.c.amenity_id)
+
+        scale = 100 / sample_percent if sample_percent else 1
+        counts = {"category": [], "amenity": [], "num_bed": [], "num_bath": [], "price": []}
+        for facet, value, count in db.execute(union_all(grouped, amenities)):
+            counts[facet].append((value, round(count * scale)))
+
+        def facet_counts(facet: str) -> List[schemas.FacetCount]:
+            return [schemas.FacetCount(value=None if value is None else int(value), count=count)
+                    for value, count in sorted(counts[facet], key=lambda item: (item[0] is None, item[0]))]
+
+        return schemas.PropertyFacets(
+            # Every property falls in exactly one category group
+            total=sum(count for _, count in counts["category"]),
+            approximate=bool(sample_percent),
+            categories=facet_counts("category"),
+            amenities=facet_counts("amenity"),
+            num_bed=facet_counts("num_bed"),
+            num_bath=facet_counts("num_bath"),
+            price=[schemas.PriceFacetCount(min_price=value, max_price=value + price_bucket_size, count=count)
+                   for value, count in sorted(counts["price"])])
+
+    def get_suggestions(self, db: Session, *, q: str, limit: int = 10) -> List[schemas.PropertySuggestion]:
+        """
+        Distinct location names and titles of enabled properties that fuzzily match `q`, best matches first.
+        Matching uses the word similarity operator, served by the trigram indexes on both columns.
+        """
+        q = " ".join(q.lower().split())
+        key = f"{limit}:{q}"
+        suggestions = suggest_cache.get(key)
+        if suggestions is not None:
+            return suggestions
+
+        def matches(column: Any, kind: str) -> Any:
+            return select([column.label("value"), literal(kind).label("kind"),
+                           func.word_similarity(q, column).label("score")])\
+                .where(literal(q).op("<%")(column))\
+                .where(Property.is_enabled == True)
+        candidates = union_all(matches(Property.location_name, "location"), matches(Property.title, "title"))\
+            .alias("candidates")
+        query = select([candidates.c.value, candidates.c.kind])\
+            .group_by(candidates.c.value, candidates.c.kind)\
+            .order_by(func.max(candidates.c.score).desc(), candidates.c.value)\
+            .limit(limit)
+        suggestions = [schemas.PropertySuggestion(value=value, kind=kind) for value, kind in db.execute(query)]
+        suggest_cache.set(key, suggestions, ttl=settings.PROPERTY_SUGGEST_CACHE_TTL)
+        return suggestions
+
+    def update_amenity_ids(self, db: Session, *, id: int) -> None:
+        """
+        Synchronize the denormalized amenity_ids of the property with its property amenities
+        """
+        amenity_ids = select([func.coalesce(func.array_agg(PropertyAmenity.amenity_id), '{}')])\
+            .where(PropertyAmenity.property_id == id).as_scalar()
+        db.query(Property).filter(Property.id == id).update({Property.amenity_ids: amenity_ids},
+                                                            synchronize_session=False)
+        db.commit()
+
+    def get_multi_cached(
+            self, db: Session, *, skip: int = 0, limit: int = 100, user_id: int,
+            filters: Optional[schemas.PropertyFilter] = None,
+            sort: Optional[str] = "-time",
+            sort_latitude: Optional[float] = None,
+            sort_longitude: Optional[float] = None,
+            cursor: Optional[schemas.PropertyCursor] = None,
+            expand: Optional[Set[str]] = None
+    ) -> List[Property]:
+        """
+        Same as get_multi, caching the IDs, distances and ranks of the results by the normalized search. The per-user
+        favorite flag is not cached and is applied when hydrating the cached IDs.
+        """
+        if not settings.PROPERTY_SEARCH_CACHE_ENABLED:
+            return self.get_multi(db=db, skip=skip, limit=limit, user_id=user_id, filters=filters, sort=sort,
+                                  sort_latitude=sort_latitude, sort_longitude=sort_longitude, cursor=cursor,
+                                  expand=expand)
+        key = self.get_search_key(skip=skip, limit=limit, filters=filters, sort=sort, sort_latitude=sort_latitude,
+                                  sort_longitude=sort_longitude, cursor=cursor)
+        rows = search_cache.get(key)
+        if rows is None:
+            properties = self.get_multi(db=db, skip=skip, limit=limit, user_id=user_id, filters=filters, sort=sort,
+                                        sort_latitude=sort_latitude, sort_longitude=sort_longitude, cursor=cursor,
+                                        expand=expand)
+            search_cache.set(key, [[property.id, property.distance, property.rank] for property in properties],
+                             ttl=settings.PROPERTY_SEARCH_CACHE_TTL)
+            return properties
+
+        rows = {id: (distance, rank) for id, distance, rank in rows}
+        properties = self.get_many_ordered(db=db, ids=list(rows), user_id=user_id, enabled_only=False,
+                                           expand=expand)
+        for property in properties:
+            property.distance, property.rank = rows[property.id]
+        return properties
+
+    export_fields = ["id", "title", "description", "num_bed", "num_bath", "location_name", "price", "latitude",
+                     "longitude", "feature_image", "is_enabled", "is_verified", "owner_id", "property_category_id",
+                     "amenity_ids", "created_at", "last_updated"]
+
+    def iter_export(
+            self, db: Session, *, filters: Optional[schemas.PropertyFilter] = None, batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the properties matching the filters as rows of export_fields, ordered by ID. The rows are
+        streamed from a server side cursor `batch_size` at a time, so memory use does not grow with the table.
+        """
+        columns = [getattr(Property, field) for field in self.export_fields if field not in ("latitude", "longitude")]
+        query = self.filter_query(db.query(Property.location, *columns), filters).order_by(Property.id)
+        for row in query.execution_options(stream_results=True).yield_per(batch_size):
+            data = row._asdict()
+            data["latitude"], data["longitude"] = data.pop("location")
+            yield data
+
+    def get_total(self, db: Session, *, filters: Optional[schemas.PropertyFilter] = None) -> Tuple[int, bool]:
+        """
+        Number of properties matching the filters and whether it is exact. The planner estimate is used when it
+        is above PROPERTY_EXACT_COUNT_THRESHOLD, so that counting never costs much more than fetching a page.
+        Totals are cached along with the searches.
+        """
+        key = "total:" + self.get_search_key(skip=0, limit=0, filters=filters)
+        total = search_cache.get(key) if settings.PROPERTY_SEARCH_CACHE_ENABLED else None
+        if total is None:
+            query = self.filter_query(db.query(Property.id), filters)
+            estimate = estimate_rows(db, query.statement)
+            if estimate > settings.PROPERTY_EXACT_COUNT_THRESHOLD:
+                total = [estimate, False]
+            else:
+                total = [query.count(), True]
+            if settings.PROPERTY_SEARCH_CACHE_ENABLED:
+                search_cache.set(key, total, ttl=settings.PROPERTY_SEARCH_CACHE_TTL)
+        return total[0], total[1]
+
+    def get_search_key(
+            self, *, skip: int, limit: int,
+            filters: Optional[schemas.PropertyFilter] = None,
+            sort: Optional[str] = None,
+            sort_latitude: Optional[float] = None,
+            sort_longitude: Optional[float] = None,
+            cursor: Optional[schemas.PropertyCursor] = None
+    ) -> str:
+        """
+        Cache key of a search, the same for searches that only differ in how the filters are written
+        """
+        search = dict()
+        if filters:
+            for field, value in filters.dict().items():
+                if value is None:
+                    continue
+                if field in ("categories", "amenities"):
+                    value = sorted({int(num) for num in str(value).split(",")})
+                elif field == "q":
+                    value = " ".join(value.lower().split())
+                search[field] = value
+        search["sort"] = sort
+        if sort_latitude is not None and sort_longitude is not None:
+            search["sort_coordinates"] = [round(sort_latitude, 5), round(sort_longitude, 5)]
+        if cursor:
+            search["cursor"] = cursor.encode()
+        else:
+            search["skip"] = skip
+        search["limit"] = limit
+        digest = hashlib.sha1(json.dumps(search, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{search_cache.get_version('properties')}:{digest}"
+
+    def invalidate_search_cache(self) -> None:
+        """
+        Invalidate all cached searches, called when properties or their amenities change
+        """
+        search_cache.bump_version("properties")
+
+    def get_sort_column(self, sort: Optional[str], sort_latitude: Optional[float] = None,
+                        sort_longitude: Optional[float] = None, q: Optional[str] = None) -> Any:
+        if sort == "relevance" and q:
+            # Ranked with the cover density of the matches, the top K of which PostgreSQL keeps with a bounded sort.
+            # The real rank is cast to double precision so that the cursor key compares equal to it on the next page.
+            return cast(func.ts_rank_cd(Property.__ts_vector__, self.get_ts_query(q)), Float)
+        if sort in ("time", "-time"):
+            return Property.created_at
+        if sort in ("price", "-price"):
+            return Property.price
+        if sort in ("distance", "-distance") and sort_latitude is not None and sort_longitude is not None:
+            return self.get_distance(sort_latitude, sort_longitude)
+        return None
+
+    def get_ts_query(self, q: str) -> Any:
+        """
+        Full text search query parsed with the web search syntax (quoted phrases, OR and -), with the last word
+        matched as a prefix so that results show up while it is being typed
+        """
+        words = q.split()
+        last_word = re.sub(r"[^\w]", "", words[-1]) if words else ""
+        rest = " ".join(words[:-1])
+        # The last word is not a prefix if it is excluded, or closes or is in a quoted phrase
+        if not last_word or words[-1].startswith("-") or q.count('"') % 2 == 1 or words[-1].endswith('"'):
+            return func.websearch_to_tsquery("english", q)
+        prefix = func.to_tsquery("english", f"{last_word}:*")
+        if not rest:
+            return prefix
+        return func.websearch_to_tsquery("english", rest).op("&&")(prefix)
+
+    def get_distance(self, latitude: float, longitude: float) -> Any:
+        """
+        Distance in metres between Property.location and the given coordinates, using the KNN operator so that
+        ordering by it walks the GiST index on the location and stops after the requested number of rows
+        """
+        return Property.location.op("<->", return_type=Float)(self.get_point(latitude, longitude))
+
+    def get_point(self, latitude: float, longitude: float) -> Any:
+        """
+        Geography point literal comparable with Property.location
+        """
+        return literal((latitude, longitude), type_=EasyGeography)
+
+    def get_cursor(self, property: Property, sort: str) -> schemas.PropertyCursor:
+        """
+        Cursor pointing at the given property, the last one of a page sorted by `sort`
+        """
+        if "time" in sort:
+            key = property.created_at
+        elif "price" in sort:
+            key = property.price
+        elif sort == "relevance":
+            key = property.rank
+        else:
+            key = property.distance
+        return schemas.PropertyCursor(sort=sort, key=key, id=property.id)
 
     def create_with_owner(
             self, db: Session, *, obj_in: schemas.PropertyCreate, owner_id: int
     ) -> Property:
         obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data, owner_id=owner_id)
+        latitude, longitude = obj_in_data["location"]
+        db_obj = self.model(**obj_in_data, owner_id=owner_id, geohash=geohash.encode(latitude, longitude))
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
         return db_obj
 
+    def update(
+            self, db: Session, *, db_obj: Property, obj_in: Union[schemas.PropertyUpdate, Dict[str, Any]]
+    ) -> Property:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        if update_data.get("location"):
+            latitude, longitude = update_data["location"]
+            update_data["geohash"] = geohash.encode(latitude, longitude)
+        return super().update(db, db_obj=db_obj, obj_in=update_data)
+
     def get_multi_by_owner(
-            self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
+            self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100,
+            loader_strategy: Optional[str] = None,
+            expand: Optional[Set[str]] = None
     ) -> List[Property]:
-        query = db.query(Property).filter(Property.owner_id == owner_id)
-        query.outerjoin(Favorite, ((Property.id == Favorite.property_id) & (Favorite.user_id == owner_id)))
-        return query.offset(skip).limit(limit).all()
+        query = db.query(Property, self.favorite_exists(owner_id)).filter(Property.owner_id == owner_id)\
+            .options(*self.get_loader_options(loader_strategy, expand))
+        return self.set_row_attributes(query.offset(skip).limit(limit).all())
 
     def get_favorite_by_owner(
-            self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100
+            self, db: Session, *, owner_id: int, skip: int = 0, limit: int = 100,
+            loader_strategy: Optional[str] = None,
+            expand: Optional[Set[str]] = None
     ) -> List[Property]:
         query = db.query(Property).join(Favorite,
-                                        ((Property.id == Favorite.property_id) & (Favorite.user_id == owner_id)))
-        return query.offset(skip).limit(limit).all()
+                                        ((Property.id == Favorite.property_id) & (Favorite.user_id == owner_id)))\
+            .options(*self.get_loader_options(loader_strategy, expand))
+        properties = query.offset(skip).limit(limit).all()
+        for property in properties:
+            property.is_favorite = True
+        return properties
 
     def get_labels(self, property: Property) -> List[str]:
         labels = [f"num_bed:{property.num_bed}", f"num_bath:{property.num_bath}",
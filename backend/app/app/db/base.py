@@ -9,5 +9,8 @@ from app.models.property_amenity import PropertyAmenity  # noqa
 from app.models.favorite import Favorite  # noqa
 from app.models.feedback import Feedback  # noqa
 from app.models.property_photo import PropertyPhoto  # noqa
+from app.models.gorse_outbox import GorseOutbox  # noqa
+from app.models.property_popularity import PropertyPopularity  # noqa
 from app.models.ts_vector import TSVector  # noqa
 from app.models.easy_geometry import EasyGeometry  # noqa
+from app.models.easy_geography import EasyGeography  # noqa
@@ -0,0 +1,32 @@
+import json
+from typing import Any
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from sqlalchemy.orm import Session
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN of a statement, with the plan returned as JSON
+    """
+    # Not cached by SQLAlchemy 1.4, as the wrapped statement is not part of a cache key
+    inherit_cache = False
+
+    def __init__(self, statement: Any):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def compile_explain(element: Explain, compiler: Any, **kw: Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def estimate_rows(db: Session, statement: Any) -> int:
+    """
+    Number of rows the planner estimates the statement returns, without running it
+    """
+    plan = db.execute(Explain(statement)).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
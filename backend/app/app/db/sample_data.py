@@ -0,0 +1,33 @@
+from datetime import datetime
+from typing import List
+
+from app import models
+
+
+def make_property_page(size: int = 100) -> List[models.Property]:
+    """
+    Page of properties like one loaded for the properties list, built in memory so no database is needed
+    """
+    now = datetime.now()
+    owner = models.User(id=1, first_name="Jane", last_name="Doe", email="jane@example.com", phone="0700000000",
+                        is_verified=True, is_active=True, is_superuser=False, created_at=now)
+    category = models.PropertyCategory(id=1, title="Apartment", description="Apartment",
+                                       icon="https://example.com/apartment.png", created_at=now)
+    amenities = [models.Amenity(id=i, title=f"Amenity {i}", description="Amenity",
+                                icon="https://example.com/amenity.png", created_at=now) for i in range(5)]
+    properties = list()
+    for i in range(size):
+        property = models.Property(id=i, title=f"Property {i}", description="A property", num_bed=2, num_bath=1,
+                                   location_name="Nairobi", price=25000, location=(-1.28, 36.82),
+                                   feature_image="https://example.com/feature.png", is_enabled=True,
+                                   is_verified=True, owner_id=owner.id, property_category_id=category.id,
+                                   created_at=now)
+        property.owner = owner
+        property.property_category = category
+        property.property_amenities = [models.PropertyAmenity(property_id=i, amenity_id=amenity.id, amenity=amenity,
+                                                              created_at=now) for amenity in amenities]
+        property.property_photos = [models.PropertyPhoto(id=j, property_id=i, photo="https://example.com/photo.png",
+                                                         created_at=now) for j in range(5)]
+        property.is_favorite = i % 2 == 0
+        properties.append(property)
+    return properties
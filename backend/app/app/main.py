@@ -3,6 +3,9 @@ from starlette.middleware.cors import CORSMiddleware
 
 from app.api.api_v1.api import api_router
 from app.core.config import settings
+from app.recommend import gorse
+from app.recommend import outbox  # noqa: F401, records the changes to send to Gorse
+from app.recommend import popularity  # noqa: F401, scores the properties from their feedback
 
 app = FastAPI(
     title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_STR}/openapi.json"
@@ -16,6 +19,14 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Response headers the web client reads, such as the cursor of the next page
+        expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Exact", "ETag"],
     )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+
+
+@app.on_event("shutdown")
+async def close_gorse_clients() -> None:
+    gorse.sync_client.close()
+    await gorse.async_client.close()
@@ -3,9 +3,12 @@ from .property_category import PropertyCategory
 from .amenity import Amenity
 from .ts_vector import TSVector
 from .easy_geometry import EasyGeometry
+from .easy_geography import EasyGeography
 from .property import Property
 from .property_amenity import PropertyAmenity
 from .favorite import Favorite
 from .feedback import Feedback
 from .property_photo import PropertyPhoto
+from .gorse_outbox import GorseOutbox
 
+from .property_popularity import PropertyPopularity
@@ -0,0 +1,43 @@
+# Point column stored as a native PostGIS geography, exchanged with the database as WKB
+# instead of the WKT strings used by EasyGeometry
+
+import struct
+
+from sqlalchemy import func
+from sqlalchemy.types import UserDefinedType
+
+WKB_POINT = 1
+
+
+class EasyGeography(UserDefinedType):
+
+    def get_col_spec(self):
+        return "geography(Point,4326)"
+
+    def bind_expression(self, bindvalue):
+        return func.ST_GeogFromWKB(bindvalue, type_=self)
+
+    def column_expression(self, col):
+        return func.ST_AsBinary(col, type_=self)
+
+    def bind_processor(self, dialect):
+        def process(value):
+            if value is None:
+                return None
+            if (isinstance(value, list)):
+                value = tuple(value)
+            assert isinstance(value, tuple)
+            lat, lng = value
+            # Little endian WKB point, with the longitude as x and the latitude as y
+            return struct.pack("<BIdd", 1, WKB_POINT, float(lng), float(lat))
+        return process
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None:
+                return None
+            value = bytes(value)
+            byte_order = "<" if value[0] == 1 else ">"
+            lng, lat = struct.unpack(f"{byte_order}dd", value[5:21])
+            return (lat, lng)
+        return process
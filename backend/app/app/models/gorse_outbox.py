@@ -0,0 +1,25 @@
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Index, Integer, String, func
+
+from app.db.base_class import Base
+
+
+class GorseOutbox(Base):
+    """
+    Change to send to Gorse, recorded in the transaction of the change and delivered by the worker.
+    Rows with the same key are delivered in the order of their IDs. Rows rejected by Gorse are kept, with their
+    failed_at set, rather than deleted.
+    """
+    id = Column(BigInteger, primary_key=True)
+    action = Column(String, nullable=False)
+    key = Column(String, nullable=False)
+    payload = Column(JSON, nullable=False, default=dict)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime, nullable=False, default=func.now(), server_default=func.now())
+    last_error = Column(String, nullable=True)
+    failed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_gorseoutbox_next_attempt_at_id", "next_attempt_at", "id", postgresql_where=failed_at.is_(None)),
+        Index("ix_gorseoutbox_key_id", "key", "id"),
+    )
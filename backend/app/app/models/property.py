@@ -1,13 +1,13 @@
 from typing import TYPE_CHECKING
 
 from sqlalchemy import Column, ForeignKey, Integer, String, Float, Boolean, DateTime, func, Computed, Index
-from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import relationship
 
 from app.db.base_class import Base
 
 from app.models.ts_vector import TSVector
-from app.models.easy_geometry import EasyGeometry
+from app.models.easy_geography import EasyGeography
 
 if TYPE_CHECKING:
     from .user import User  # noqa: F401
@@ -23,13 +23,18 @@ class Property(Base):
     num_bath = Column(Integer, nullable=False, default=0, index=True)
     location_name = Column(String, nullable=True, index=True)
     price = Column(Float, nullable=False, default=0, index=True)
-    location = Column(EasyGeometry, nullable=False, index=True)
+    location = Column(EasyGeography, nullable=False)
+    # Geohash of the location, where properties in the same area share a prefix. The C collation lets prefix
+    # matches use the index as range scans
+    geohash = Column(String(12, collation="C"), nullable=True, index=True)
     is_enabled = Column(Boolean, nullable=False, default=True, index=True)
     is_verified = Column(Boolean, nullable=False, default=False, index=True)
     owner_id = Column(Integer, ForeignKey("user.id"))
     property_category_id = Column(Integer, ForeignKey("propertycategory.id"))
     created_at = Column(DateTime, default=func.now(), nullable=False)
     last_updated = Column('last_updated', DateTime, onupdate=func.now())
+    # Denormalized IDs of the amenities in property_amenities, used for filtering by amenities without a join
+    amenity_ids = Column(ARRAY(Integer), nullable=False, default=list, server_default='{}')
     owner = relationship("User", back_populates="properties")
     property_category = relationship("PropertyCategory", back_populates="properties")
     property_amenities = relationship("PropertyAmenity", back_populates="property")
@@ -42,9 +47,27 @@ class Property(Base):
         "to_tsvector('english', title || ' ' || description || ' ' || location_name)",
         persisted=True))
     __table_args__ = (Index('ix_property___ts_vector__',
-                            __ts_vector__, postgresql_using='gin'),)
+                            __ts_vector__, postgresql_using='gin'),
+                      Index('ix_property_location', location, postgresql_using='gist'),
+                      Index('ix_property_amenity_ids', amenity_ids, postgresql_using='gin'),
+                      # Used for fuzzy matching of suggestions, requires the pg_trgm extension
+                      Index('ix_property_title_trgm', title, postgresql_using='gin',
+                            postgresql_ops={'title': 'gin_trgm_ops'}),
+                      Index('ix_property_location_name_trgm', location_name, postgresql_using='gin',
+                            postgresql_ops={'location_name': 'gin_trgm_ops'}),
+                      # Used for keyset pagination when sorting by time and price
+                      Index('ix_property_created_at_id', created_at, id),
+                      Index('ix_property_price_id', price, id),)
 
-    @hybrid_property
-    def is_favorite(self):
-        is_fave = (self.favorites is not None and (len(self.favorites) > 0))
-        return is_fave
+    # Whether the property is a favorite of the user it was loaded for, set by CRUDProperty
+    is_favorite = False
+    # Distance in metres from the sort coordinates, set by CRUDProperty when they are given
+    distance = None
+    # Full text search rank, set by CRUDProperty when sorting by relevance
+    rank = None
+
+    @property
+    def distance_km(self):
+        if self.distance is None:
+            return None
+        return self.distance / 1000
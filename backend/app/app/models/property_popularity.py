@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer
+
+from app.db.base_class import Base
+
+
+class PropertyPopularity(Base):
+    """
+    Popularity of a property from its feedback, as a sum of forward decayed weights: every feedback adds its weight
+    scaled by exp(rate * (time - epoch)), so the scores only grow yet rank the properties like the time-decayed sums.
+    The category of the property is copied so that the top properties of a category are read from an index.
+    """
+    property_id = Column(Integer, ForeignKey("property.id", ondelete="CASCADE"), primary_key=True)
+    property_category_id = Column(Integer, nullable=True)
+    score = Column(Float, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_propertypopularity_score", "score"),
+        Index("ix_propertypopularity_property_category_id_score", "property_category_id", "score"),
+    )
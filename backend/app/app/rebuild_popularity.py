@@ -0,0 +1,18 @@
+import logging
+
+from app.db.session import SessionLocal
+from app.recommend import popularity
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logger.info("Rebuilding the popularity of the properties")
+    db = SessionLocal()
+    popularity.rebuild(db)
+    logger.info("Popularity of the properties rebuilt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Circuit breaker of the calls to Gorse.
+
+The circuit opens after GORSE_BREAKER_FAILURE_THRESHOLD consecutive calls that failed because Gorse was unavailable,
+or answered slower than GORSE_BREAKER_SLOW_CALL_DURATION seconds. While it is open, calls fail straight away so the
+endpoints serve their local fallback. After GORSE_BREAKER_RESET_TIMEOUT seconds the circuit is half open: a single
+probe is sent in the background, which closes the circuit when it succeeds and opens it again when it fails.
+"""
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BreakerState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int, slow_call_duration: float, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.slow_call_duration = slow_call_duration
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        self.last_error: Optional[str] = None
+        # The synchronous client is shared by the threads of the threadpool
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> BreakerState:
+        if self.opened_at is None:
+            return BreakerState.CLOSED
+        if self.probing or time.monotonic() - self.opened_at >= self.reset_timeout:
+            return BreakerState.HALF_OPEN
+        return BreakerState.OPEN
+
+    def allow(self) -> bool:
+        """
+        Whether a call may be sent, which is only when the circuit is closed
+        """
+        return self.opened_at is None
+
+    def start_probe(self) -> bool:
+        """
+        Whether the caller should send the probe of the half open circuit, which is granted to a single caller
+        """
+        with self.lock:
+            if self.probing or self.state != BreakerState.HALF_OPEN:
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self, duration: float) -> None:
+        if duration > self.slow_call_duration:
+            return self.record_failure(f"Gorse answered in {duration:.2f}s")
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info("Closing the circuit to Gorse")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self, error: str) -> None:
+        with self.lock:
+            self.failures += 1
+            self.last_error = error
+            if self.probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+                logger.warning(f"Opening the circuit to Gorse after {self.failures} failures: {error}")
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def get_open_for(self) -> Optional[float]:
+        opened_at = self.opened_at
+        return None if opened_at is None else time.monotonic() - opened_at
+
+    def reset(self) -> None:
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+            self.last_error = None
+
+
+def create_breaker() -> CircuitBreaker:
+    return CircuitBreaker(failure_threshold=settings.GORSE_BREAKER_FAILURE_THRESHOLD,
+                          slow_call_duration=settings.GORSE_BREAKER_SLOW_CALL_DURATION,
+                          reset_timeout=settings.GORSE_BREAKER_RESET_TIMEOUT)
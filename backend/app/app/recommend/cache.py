@@ -0,0 +1,105 @@
+"""
+In-process caches of the Gorse recommendations, for the async endpoints.
+
+Lists shared by all users are served fresh for RECOMMEND_CACHE_TTL seconds, then served stale while they are
+refreshed in the background for RECOMMEND_CACHE_STALE_TTL more seconds. Concurrent misses of the same key wait on a
+single request to Gorse. Recommendations for a user are cached separately, for a shorter time and never stale.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.recommend import gorse
+
+
+class RecommendationCache:
+    def __init__(self, ttl: float, stale_ttl: float = 0, maxsize: int = 1024):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self.entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.pending: Dict[Hashable, "asyncio.Future[Any]"] = dict()
+        self.refreshing: Set["asyncio.Future[Any]"] = set()
+
+    async def get(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        The cached value of the key, fetched when missing or expired. Failed fetches, which return None, are not
+        cached, and a stale value is kept until a fetch succeeds.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            fetched_at, value = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self.entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                if key not in self.pending:
+                    refresh = self.fetch(key, fetch)
+                    self.refreshing.add(refresh)
+                    refresh.add_done_callback(self.refreshing.discard)
+                self.entries.move_to_end(key)
+                return value
+        return await asyncio.shield(self.fetch(key, fetch))
+
+    def fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> "asyncio.Future[Any]":
+        """
+        Future of the value fetched for the key, shared by all the callers while the fetch is in flight
+        """
+        if key in self.pending:
+            return self.pending[key]
+
+        async def run() -> Any:
+            try:
+                value = await fetch()
+                if value is not None:
+                    self.set(key, value)
+                return value
+            finally:
+                del self.pending[key]
+
+        future = asyncio.ensure_future(run())
+        self.pending[key] = future
+        return future
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+
+shared_cache = RecommendationCache(ttl=settings.RECOMMEND_CACHE_TTL, stale_ttl=settings.RECOMMEND_CACHE_STALE_TTL,
+                                   maxsize=settings.RECOMMEND_CACHE_SIZE)
+user_cache = RecommendationCache(ttl=settings.RECOMMEND_USER_CACHE_TTL, maxsize=settings.RECOMMEND_CACHE_SIZE)
+
+
+async def get_latest_items(category: Optional[int] = None, skip: int = 0, limit: int = 0) -> Any:
+    return await shared_cache.get(
+        ("latest", category, skip, limit),
+        lambda: gorse.get_latest_items(category=category, skip=skip, limit=limit, client=gorse.async_client))
+
+
+async def get_popular_items(category: Optional[int] = None, skip: int = 0, limit: int = 0) -> Any:
+    return await shared_cache.get(
+        ("popular", category, skip, limit),
+        lambda: gorse.get_popular_items(category=category, skip=skip, limit=limit, client=gorse.async_client))
+
+
+async def get_item_neighbors(item_id: int, category: Optional[int] = None, skip: int = 0, limit: int = 0) -> Any:
+    return await shared_cache.get(
+        ("neighbors", item_id, category, skip, limit),
+        lambda: gorse.get_item_neighbors(item_id=item_id, category=category, skip=skip, limit=limit,
+                                         client=gorse.async_client))
+
+
+async def get_recommended_items(user_id: int, category: Optional[int] = None, skip: int = 0, limit: int = 0) -> Any:
+    return await user_cache.get(
+        ("recommend", user_id, category, skip, limit),
+        lambda: gorse.get_recommended_items(user_id=user_id, category=category, skip=skip, limit=limit,
+                                            client=gorse.async_client))
@@ -1,173 +1,318 @@
-from typing import List, Any, Optional
-
-import requests
+"""
+Client of the Gorse recommender API.
+
+Every function sends its request with the pooled synchronous client by default, and returns the decoded response,
+or None when Gorse fails or cannot be reached in time. Clients created with `raise_errors=True` raise the GorseError
+instead. The default clients share a circuit breaker, see `app.recommend.breaker`, and fail straight away while it
+is open. When `client=async_client` is passed, the function instead returns an awaitable of the same result, so that
+async endpoints keep many calls in flight:
+
+    latest = await gorse.get_latest_items(limit=10, client=gorse.async_client)
+"""
+import asyncio
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Set, Union
+
+import httpx
+from fastapi.encoders import jsonable_encoder
 
 from app.core.config import settings
+from app.recommend.breaker import CircuitBreaker, create_breaker
 
 from app.schemas.gorse_feedback import GorseFeedback
-from fastapi.encoders import jsonable_encoder
-
 from app.schemas.gorse_item import GorseItem
 from app.schemas.gorse_user import GorseUser
 
-from app.schemas.feedback_type import FeedbackType
+logger = logging.getLogger(__name__)
 
 url = f"{settings.GORSE_API_URL}/api/"
-header = {"X-API-Key": ""}
-session = requests.Session()
+header = {"X-API-Key": settings.GORSE_API_KEY}
+
+
+class GorseError(Exception):
+    """
+    Failure of a request to Gorse
+    """
+
+
+class GorseUnavailableError(GorseError):
+    """
+    Gorse could not be reached, did not answer before the deadline or failed on its side
+    """
+
+
+class GorseTimeoutError(GorseUnavailableError):
+    pass
+
+
+class GorseRequestError(GorseError):
+    """
+    Gorse rejected the request
+    """
 
 
-def get_results(endpoint: str, params: dict):
-    try:
-        r = session.get(f"{url}{endpoint}", params=params,
-                        headers=header)
-        if r.status_code == 200:
-            return r.json()
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
+def map_error(error: Exception, endpoint: str) -> GorseError:
+    if isinstance(error, httpx.TimeoutException):
+        return GorseTimeoutError(f"Gorse did not answer {endpoint} in time")
+    if isinstance(error, httpx.HTTPStatusError):
+        status_code = error.response.status_code
+        if status_code >= 500:
+            return GorseUnavailableError(f"Gorse failed on {endpoint} with status {status_code}")
+        return GorseRequestError(f"Gorse rejected {endpoint} with status {status_code}")
+    return GorseUnavailableError(f"Unable to connect to Gorse for {endpoint}: {error}")
 
 
-def insert_feedback(feedbacks: List[GorseFeedback]) -> Any:
+def decode(response: httpx.Response) -> Any:
+    response.raise_for_status()
+    if not response.content:
+        return None
+    return response.json()
+
+
+def get_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.GORSE_READ_TIMEOUT, connect=settings.GORSE_CONNECT_TIMEOUT,
+                         pool=settings.GORSE_CONNECT_TIMEOUT)
+
+
+def get_limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=settings.GORSE_MAX_CONNECTIONS,
+                        max_keepalive_connections=settings.GORSE_MAX_CONNECTIONS)
+
+
+class BaseClient(ABC):
+    def __init__(self, raise_errors: bool = False, breaker: Optional[CircuitBreaker] = None) -> None:
+        self.raise_errors = raise_errors
+        self.breaker = breaker
+
+    def handle_error(self, error: GorseError) -> None:
+        if self.raise_errors:
+            raise error
+        logger.warning(error)
+
+    def allow(self) -> bool:
+        """
+        Whether the circuit lets a request through, starting its probe when it is half open
+        """
+        if self.breaker is None or self.breaker.allow():
+            return True
+        if self.breaker.start_probe():
+            self.start_probe()
+        return False
+
+    def record(self, started_at: float, error: Optional[GorseError] = None) -> None:
+        if self.breaker is None or isinstance(error, GorseRequestError):
+            return
+        if error is None:
+            self.breaker.record_success(time.monotonic() - started_at)
+        else:
+            self.breaker.record_failure(str(error))
+
+    @abstractmethod
+    def start_probe(self) -> None:
+        """
+        Send the probe of the half open circuit in the background
+        """
+
+
+class SyncClient(BaseClient):
+    def __init__(self, raise_errors: bool = False, breaker: Optional[CircuitBreaker] = None, **kwargs: Any) -> None:
+        super().__init__(raise_errors, breaker)
+        self.client = httpx.Client(base_url=url, headers=header, timeout=get_timeout(), limits=get_limits(),
+                                   **kwargs)
+
+    def request(self, method: str, endpoint: str, **kwargs: Any) -> Any:
+        if not self.allow():
+            return self.handle_error(GorseUnavailableError(f"Circuit to Gorse is open, skipping {endpoint}"))
+        return self.send(method, endpoint, **kwargs)
+
+    def send(self, method: str, endpoint: str, **kwargs: Any) -> Any:
+        started_at = time.monotonic()
+        try:
+            result = decode(self.client.request(method, endpoint, **kwargs))
+        except (httpx.HTTPError, ValueError) as error:
+            gorse_error = map_error(error, endpoint)
+            self.record(started_at, gorse_error)
+            return self.handle_error(gorse_error)
+        self.record(started_at)
+        return result
+
+    def start_probe(self) -> None:
+        threading.Thread(target=self.probe, daemon=True).start()
+
+    def probe(self) -> None:
+        try:
+            self.send("GET", "latest", params={"n": 1})
+        except GorseError:
+            pass
+
+    def close(self) -> None:
+        self.client.close()
+
+
+class AsyncClient(BaseClient):
+    def __init__(self, raise_errors: bool = False, breaker: Optional[CircuitBreaker] = None, **kwargs: Any) -> None:
+        super().__init__(raise_errors, breaker)
+        self.client = httpx.AsyncClient(base_url=url, headers=header, timeout=get_timeout(),
+                                        limits=get_limits(), **kwargs)
+        self.probes: Set["asyncio.Future[None]"] = set()
+
+    async def request(self, method: str, endpoint: str, **kwargs: Any) -> Any:
+        if not self.allow():
+            return self.handle_error(GorseUnavailableError(f"Circuit to Gorse is open, skipping {endpoint}"))
+        return await self.send(method, endpoint, **kwargs)
+
+    async def send(self, method: str, endpoint: str, **kwargs: Any) -> Any:
+        started_at = time.monotonic()
+        try:
+            result = decode(await self.client.request(method, endpoint, **kwargs))
+        except (httpx.HTTPError, ValueError) as error:
+            gorse_error = map_error(error, endpoint)
+            self.record(started_at, gorse_error)
+            return self.handle_error(gorse_error)
+        self.record(started_at)
+        return result
+
+    def start_probe(self) -> None:
+        probe = asyncio.ensure_future(self.probe())
+        self.probes.add(probe)
+        probe.add_done_callback(self.probes.discard)
+
+    async def probe(self) -> None:
+        try:
+            await self.send("GET", "latest", params={"n": 1})
+        except GorseError:
+            pass
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+Client = Union[SyncClient, AsyncClient]
+
+# The clients of the endpoints share a circuit breaker, so that they serve their fallback while Gorse is unhealthy
+breaker = create_breaker()
+sync_client = SyncClient(breaker=breaker)
+async_client = AsyncClient(breaker=breaker)
+
+
+def format_timestamp(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Format the encoded timestamp with millisecond precision, as expected by Gorse
+    """
+    timestamp = data["Timestamp"]
+    data["Timestamp"] = f"{timestamp[:len(timestamp) - 3]}Z"
+    return data
+
+
+def get_results(endpoint: str, params: dict, client: Optional[Client] = None) -> Any:
+    return (client or sync_client).request("GET", endpoint, params=params)
+
+
+def insert_feedback(feedbacks: List[GorseFeedback], client: Optional[Client] = None) -> Any:
     endpoint = "feedback"
-    try:
-        feedback_json = jsonable_encoder(feedbacks)
-        for feedback in feedback_json:
-            timestamp = feedback["Timestamp"]
-            feedback["Timestamp"] = f"{timestamp[:len(timestamp) - 3]}Z"
-        r = session.put(f"{url}{endpoint}", json=feedback_json,
-                        headers=header)
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
-
-
-def remove_feedback(user_id: int, item_id: int, feedback_type: str) -> Any:
+    feedback_json = [format_timestamp(feedback) for feedback in jsonable_encoder(feedbacks)]
+    return (client or sync_client).request("PUT", endpoint, json=feedback_json)
+
+
+def remove_feedback(user_id: int, item_id: int, feedback_type: str, client: Optional[Client] = None) -> Any:
     endpoint = f"feedback/{str(feedback_type).lower()}/{user_id}/{item_id}"
-    try:
-        r = session.delete(f"{url}{endpoint}", headers=header)
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
+    return (client or sync_client).request("DELETE", endpoint)
 
 
-def get_collaborative_item_recommendations(user_id: int, category: Optional[int] = None, skip: int = 0, limit: int = 0) -> Any:
+def get_collaborative_item_recommendations(user_id: int, category: Optional[int] = None, skip: int = 0,
+                                           limit: int = 0, client: Optional[Client] = None) -> Any:
     endpoint = f"intermediate/recommend/{user_id}"
     if category:
         endpoint = f"intermediate/recommend/{user_id}/{category}"
     params = {"n": limit, "offset": skip}
-    return get_results(endpoint, params)
+    return get_results(endpoint, params, client)
 
 
-def insert_item(item: GorseItem) -> Any:
+def insert_item(item: GorseItem, client: Optional[Client] = None) -> Any:
     endpoint = "item"
-    try:
-        item_json = jsonable_encoder(item)
-        timestamp = item_json["Timestamp"]
-        item_json["Timestamp"] = f"{timestamp[:len(timestamp)-3]}Z"
-        r = session.post(f"{url}{endpoint}", json=item_json,
-                         headers=header)
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
+    return (client or sync_client).request("POST", endpoint, json=format_timestamp(jsonable_encoder(item)))
 
 
-def remove_item(item_id: int) -> Any:
+def insert_items(items: List[GorseItem], client: Optional[Client] = None) -> Any:
+    endpoint = "items"
+    return (client or sync_client).request("POST", endpoint,
+                                           json=[format_timestamp(item) for item in jsonable_encoder(items)])
+
+
+def remove_item(item_id: int, client: Optional[Client] = None) -> Any:
     endpoint = f"item/{item_id}"
-    try:
-        r = session.delete(f"{url}{endpoint}", headers=header)
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
+    return (client or sync_client).request("DELETE", endpoint)
 
 
-def update_item(item_id: int, item: GorseItem) -> Any:
+def update_item(item_id: int, item: GorseItem, client: Optional[Client] = None) -> Any:
     endpoint = f"item/{item_id}"
-    try:
-        item_json = jsonable_encoder(item)
-        timestamp = item_json["Timestamp"]
-        item_json["Timestamp"] = f"{timestamp[:len(timestamp)-3]}Z"
-        print(f"Item Sent {item_json}")
-        r = session.patch(f"{url}{endpoint}", json=item_json,
-                          headers=header)
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
-
-
-def add_category_to_item(item_id: int, category: int) -> Any:
+    return (client or sync_client).request("PATCH", endpoint, json=format_timestamp(jsonable_encoder(item)))
+
+
+def add_category_to_item(item_id: int, category: int, client: Optional[Client] = None) -> Any:
     endpoint = f"item/{item_id}/category/{category}"
-    try:
-        r = session.put(f"{url}{endpoint}", headers=header)
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
+    return (client or sync_client).request("PUT", endpoint)
 
 
-def remove_category_from_item(item_id: int, category: int) -> Any:
+def remove_category_from_item(item_id: int, category: int, client: Optional[Client] = None) -> Any:
     endpoint = f"item/{item_id}/category/{category}"
-    try:
-        r = session.delete(f"{url}{endpoint}", headers=header)
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
+    return (client or sync_client).request("DELETE", endpoint)
 
 
-def get_item_neighbors(item_id: int, category: Optional[int] = None, skip: int = 0, limit: int = 0) -> Any:
+def get_item_neighbors(item_id: int, category: Optional[int] = None, skip: int = 0, limit: int = 0,
+                       client: Optional[Client] = None) -> Any:
     endpoint = f"item/{item_id}/neighbors"
     if category:
         endpoint = f"item/{item_id}/neighbors/{category}"
     params = {"n": limit, "offset": skip}
-    return get_results(endpoint, params)
+    return get_results(endpoint, params, client)
 
 
-def get_latest_items(category: Optional[int] = None, skip: int = 0, limit: int = 0) -> Any:
+def get_latest_items(category: Optional[int] = None, skip: int = 0, limit: int = 0,
+                     client: Optional[Client] = None) -> Any:
     endpoint = f"latest"
     if category:
         endpoint = f"latest/{category}"
     params = {"n": limit, "offset": skip}
-    return get_results(endpoint, params)
+    return get_results(endpoint, params, client)
 
 
-def get_popular_items(category: Optional[int] = None, skip: int = 0, limit: int = 0) -> Any:
+def get_popular_items(category: Optional[int] = None, skip: int = 0, limit: int = 0,
+                      client: Optional[Client] = None) -> Any:
     endpoint = f"popular"
     if category:
         endpoint = f"popular/{category}"
     params = {"n": limit, "offset": skip}
-    return get_results(endpoint, params)
+    return get_results(endpoint, params, client)
 
 
-def get_recommended_items(user_id: int, category: Optional[int] = None, skip: int = 0, limit: int = 0) -> Any:
+def get_recommended_items(user_id: int, category: Optional[int] = None, skip: int = 0, limit: int = 0,
+                          client: Optional[Client] = None) -> Any:
     endpoint = f"recommend/{user_id}"
     if category:
         endpoint = f"recommend/{user_id}/{category}"
     params = {"n": limit, "offset": skip}
-    return get_results(endpoint, params)
+    return get_results(endpoint, params, client)
 
 
-def insert_user(user: GorseUser) -> Any:
-    print(f"User {jsonable_encoder(user)}")
+def insert_user(user: GorseUser, client: Optional[Client] = None) -> Any:
     endpoint = "user"
-    try:
-        r = session.post(f"{url}{endpoint}", json=jsonable_encoder(user),
-                         headers=header)
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
+    return (client or sync_client).request("POST", endpoint, json=jsonable_encoder(user))
 
 
-def remove_user(user_id: int) -> Any:
+def remove_user(user_id: int, client: Optional[Client] = None) -> Any:
     endpoint = f"user/{user_id}"
-    try:
-        r = session.delete(f"{url}{endpoint}", headers=header)
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
+    return (client or sync_client).request("DELETE", endpoint)
 
 
-def update_user(user_id: int, user: GorseUser) -> Any:
+def update_user(user_id: int, user: GorseUser, client: Optional[Client] = None) -> Any:
     endpoint = f"user/{user_id}"
-    try:
-        r = session.patch(f"{url}{endpoint}", json=jsonable_encoder(user),
-                          headers=header)
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
+    return (client or sync_client).request("PATCH", endpoint, json=jsonable_encoder(user))
 
 
-def insert_users(users: List[GorseUser]) -> Any:
+def insert_users(users: List[GorseUser], client: Optional[Client] = None) -> Any:
     endpoint = "users"
-    try:
-        r = session.post(f"{url}{endpoint}", json=jsonable_encoder(users),
-                         headers=header)
-    except ConnectionRefusedError:
-        print("Unable to connect to Gorse Server")
+    return (client or sync_client).request("POST", endpoint, json=jsonable_encoder(users))
@@ -0,0 +1,219 @@
+"""
+Transactional outbox of the changes to send to Gorse.
+
+Mapper events record a row in the gorseoutbox table, on the connection of the flush, whenever a property, its
+amenities, a user, a feedback or a favorite changes, so the change and its row commit or roll back together. Items
+and users are recorded by ID and sent with their state at delivery, while feedback removals carry their payload.
+
+The worker drains the table with `drain`: the due rows are grouped by action and sent with the bulk endpoints of
+Gorse where there is one. Rows of the same key (item, user or feedback) are delivered in order, and rows failing
+because Gorse is unavailable are retried with an exponential backoff, holding back the later rows of their key. When
+Gorse rejects a bulk request its rows are sent one at a time, and the rows Gorse rejects alone are kept with their
+failed_at set, for inspection.
+"""
+import logging
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, aliased, selectinload
+from sqlalchemy.sql.expression import exists
+
+from app import crud, schemas
+from app.core.config import settings
+from app.models import Favorite, Feedback, GorseOutbox, Property, PropertyAmenity, User
+from app.recommend import gorse
+
+logger = logging.getLogger(__name__)
+
+# Actions sent with a bulk endpoint, the others are sent one row at a time
+BULK_ACTIONS = {"item.upsert", "user.upsert", "feedback.insert"}
+
+# Key of the advisory lock held while draining, so that a single worker delivers the rows in order
+DRAIN_LOCK_ID = 7305871
+
+client = gorse.SyncClient(raise_errors=True)
+
+
+def record(connection: Any, action: str, key: str, payload: Optional[Dict[str, Any]] = None) -> None:
+    connection.execute(GorseOutbox.__table__.insert().values(action=action, key=key, payload=payload or dict()))
+
+
+def feedback_key(feedback_type: str, user_id: int, item_id: int) -> str:
+    return f"feedback:{feedback_type.lower()}:{user_id}:{item_id}"
+
+
+@event.listens_for(Property, "after_insert")
+@event.listens_for(Property, "after_update")
+def record_property(mapper: Any, connection: Any, target: Property) -> None:
+    record(connection, "item.upsert", f"item:{target.id}", {"id": target.id})
+
+
+@event.listens_for(Property, "after_delete")
+def record_property_delete(mapper: Any, connection: Any, target: Property) -> None:
+    record(connection, "item.delete", f"item:{target.id}", {"id": target.id})
+
+
+@event.listens_for(PropertyAmenity, "after_insert")
+@event.listens_for(PropertyAmenity, "after_delete")
+def record_property_amenity(mapper: Any, connection: Any, target: PropertyAmenity) -> None:
+    record(connection, "item.upsert", f"item:{target.property_id}", {"id": target.property_id})
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+def record_user(mapper: Any, connection: Any, target: User) -> None:
+    record(connection, "user.upsert", f"user:{target.id}", {"id": target.id})
+
+
+@event.listens_for(User, "after_delete")
+def record_user_delete(mapper: Any, connection: Any, target: User) -> None:
+    record(connection, "user.delete", f"user:{target.id}", {"id": target.id})
+
+
+@event.listens_for(Feedback, "after_insert")
+def record_feedback(mapper: Any, connection: Any, target: Feedback) -> None:
+    record(connection, "feedback.insert", feedback_key(target.feedback_type, target.user_id, target.property_id),
+           {"id": target.id})
+
+
+@event.listens_for(Favorite, "after_delete")
+def record_favorite_delete(mapper: Any, connection: Any, target: Favorite) -> None:
+    feedback_type = schemas.FeedbackType.FAVORITE.value
+    record(connection, "feedback.delete", feedback_key(feedback_type, target.user_id, target.property_id),
+           {"user_id": target.user_id, "item_id": target.property_id, "feedback_type": feedback_type.lower()})
+
+
+def deliver(db: Session, action: str, rows: List[GorseOutbox]) -> None:
+    """
+    Send the changes of the rows, which all have the given action and distinct keys
+    """
+    ids = [row.payload.get("id") for row in rows]
+    if action == "item.upsert":
+        properties = db.query(Property).options(selectinload(Property.property_amenities))\
+            .filter(Property.id.in_(ids)).all()
+        items = [schemas.GorseItem(Categories=crud.property.get_categories(property),
+                                   IsHidden=(not property.is_enabled),
+                                   Comment=f"Owned by {property.owner_id}",
+                                   ItemId=property.id,
+                                   Labels=crud.property.get_labels(property),
+                                   Timestamp=property.last_updated or property.created_at) for property in properties]
+        if items:
+            gorse.insert_items(items, client=client)
+    elif action == "user.upsert":
+        users = db.query(User).filter(User.id.in_(ids)).all()
+        if users:
+            gorse.insert_users([schemas.GorseUser(Subscribe=list(),
+                                                  Comment=f"User {user.id}",
+                                                  UserId=user.id,
+                                                  Labels=[user.location]) for user in users], client=client)
+    elif action == "feedback.insert":
+        feedbacks = db.query(Feedback).filter(Feedback.id.in_(ids)).all()
+        if feedbacks:
+            gorse.insert_feedback([schemas.GorseFeedback(Comment=f"Created by {feedback.user_id}",
+                                                         FeedbackType=feedback.feedback_type.lower(),
+                                                         ItemId=feedback.property_id,
+                                                         UserId=feedback.user_id,
+                                                         Timestamp=feedback.created_at) for feedback in feedbacks],
+                                  client=client)
+    elif action == "item.delete":
+        for id in ids:
+            gorse.remove_item(id, client=client)
+    elif action == "user.delete":
+        for id in ids:
+            gorse.remove_user(id, client=client)
+    elif action == "feedback.delete":
+        for row in rows:
+            gorse.remove_feedback(client=client, **row.payload)
+    else:
+        raise gorse.GorseRequestError(f"Unknown outbox action {action}")
+
+
+def get_due_rows(db: Session, limit: int) -> List[GorseOutbox]:
+    """
+    The oldest due rows, leaving out the failed rows and the rows held back by an earlier row of their key waiting for
+    a retry
+    """
+    earlier = aliased(GorseOutbox)
+    held_back = exists().where((earlier.key == GorseOutbox.key) & (earlier.id < GorseOutbox.id)
+                               & earlier.failed_at.is_(None) & (earlier.next_attempt_at > func.now()))
+    return db.query(GorseOutbox).filter(GorseOutbox.failed_at.is_(None), GorseOutbox.next_attempt_at <= func.now(),
+                                        ~held_back).order_by(GorseOutbox.id).limit(limit).all()
+
+
+def drain(db: Session, batch_size: Optional[int] = None) -> int:
+    """
+    Deliver a batch of due rows, and return the number of rows handled. Returns 0 without delivering when another
+    worker is draining.
+    """
+    batch_size = batch_size or settings.GORSE_OUTBOX_BATCH_SIZE
+    if not db.query(func.pg_try_advisory_xact_lock(DRAIN_LOCK_ID)).scalar():
+        return 0
+    rows = get_due_rows(db, batch_size)
+    queues: "OrderedDict[str, List[GorseOutbox]]" = OrderedDict()
+    for row in rows:
+        queues.setdefault(row.key, list()).append(row)
+
+    # Each round delivers the next change of every key, collapsing consecutive rows of the same action
+    while queues:
+        groups: Dict[str, List[List[GorseOutbox]]] = OrderedDict()
+        for key, queue in list(queues.items()):
+            count = 1
+            while count < len(queue) and queue[count].action == queue[0].action:
+                count += 1
+            groups.setdefault(queue[0].action, list()).append(queue[:count])
+            del queue[:count]
+            if not queue:
+                del queues[key]
+        for action, keys in groups.items():
+            for key_rows in deliver_keys(db, action, keys):
+                queues.pop(key_rows[0].key, None)
+    db.commit()
+    return len(rows)
+
+
+def deliver_keys(db: Session, action: str, keys: List[List[GorseOutbox]]) -> List[List[GorseOutbox]]:
+    """
+    Deliver the last row of each key, deleting the rows of the keys delivered, and return the keys to retry because
+    Gorse is unavailable. Keys of a bulk request rejected by Gorse are sent again one at a time.
+    """
+    if action in BULK_ACTIONS and len(keys) > 1:
+        batches = [keys]
+    else:
+        batches = [[key_rows] for key_rows in keys]
+    while batches:
+        batch = batches.pop(0)
+        try:
+            deliver(db, action, [key_rows[-1] for key_rows in batch])
+        except gorse.GorseRequestError as error:
+            if len(batch) > 1:
+                batches[:0] = [[key_rows] for key_rows in batch]
+            else:
+                logger.error(f"Gorse rejected {action} for {batch[0][0].key}: {error}")
+                fail(batch[0], error)
+            continue
+        except gorse.GorseUnavailableError as error:
+            unsent = batch + [key_rows for pending in batches for key_rows in pending]
+            for key_rows in unsent:
+                retry(key_rows, error)
+            return unsent
+        for key_rows in batch:
+            for row in key_rows:
+                db.delete(row)
+    return list()
+
+
+def retry(rows: List[GorseOutbox], error: Exception) -> None:
+    for row in rows:
+        row.attempts += 1
+        delay = min(settings.GORSE_OUTBOX_RETRY_DELAY * 2 ** (row.attempts - 1), settings.GORSE_OUTBOX_MAX_RETRY_DELAY)
+        row.next_attempt_at = func.now() + timedelta(seconds=delay)
+        row.last_error = str(error)
+
+
+def fail(rows: List[GorseOutbox], error: Exception) -> None:
+    for row in rows:
+        row.attempts += 1
+        row.failed_at = func.now()
+        row.last_error = str(error)
@@ -0,0 +1,97 @@
+"""
+Local popularity of the properties, computed from their feedback.
+
+Each feedback adds the weight of its type to the score of its property, decayed over time with a half life of
+POPULARITY_HALF_LIFE_DAYS. The scores use forward decay: rather than decaying every score as time passes, the weight
+of a feedback is scaled by exp(rate * (time - epoch)), which ranks the properties like the decayed sums at any time.
+A new feedback thus updates a single row, in the transaction inserting it, and the top properties overall or of a
+category are read in order from an index. `rebuild` recomputes the scores from the whole feedback history, to fill
+the table or move the epoch.
+"""
+import calendar
+import math
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.sql import case, select
+from sqlalchemy.sql.expression import ColumnElement, Insert, Select
+
+from app.core.config import settings
+from app.models import Feedback, Property, PropertyPopularity
+
+table = PropertyPopularity.__table__
+
+
+def decay(timestamp: Any) -> ColumnElement:
+    """
+    Factor of a weight at the timestamp, growing by 2 every half life from the epoch
+    """
+    rate = math.log(2) / (settings.POPULARITY_HALF_LIFE_DAYS * 24 * 3600)
+    epoch = calendar.timegm(settings.POPULARITY_EPOCH.utctimetuple())
+    return func.exp(rate * (func.extract("epoch", timestamp) - epoch))
+
+
+def get_weights() -> Dict[str, float]:
+    """
+    Weights of the feedback types, which are matched regardless of their case
+    """
+    return {feedback_type.upper(): weight for feedback_type, weight in settings.POPULARITY_WEIGHTS.items()}
+
+
+def upsert(scores: Select) -> Insert:
+    """
+    Add the scores selected per property, with the property ID, category ID and score columns
+    """
+    statement = insert(table).from_select(["property_id", "property_category_id", "score"], scores)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.property_id],
+        set_={"score": table.c.score + statement.excluded.score,
+              "property_category_id": statement.excluded.property_category_id})
+
+
+@event.listens_for(Feedback, "after_insert")
+def record_feedback(mapper: Any, connection: Any, target: Feedback) -> None:
+    weight = get_weights().get(target.feedback_type.upper())
+    if not weight:
+        return
+    # The timestamp of the database, as the default of the feedback timestamp is not loaded during the flush
+    scores = select([Property.id, Property.property_category_id, weight * decay(func.localtimestamp())])\
+        .where(Property.id == target.property_id)
+    connection.execute(upsert(scores))
+
+
+@event.listens_for(Property, "after_update")
+def record_property_category(mapper: Any, connection: Any, target: Property) -> None:
+    if get_history(target, "property_category_id").has_changes():
+        connection.execute(table.update().where(table.c.property_id == target.id)
+                           .values(property_category_id=target.property_category_id))
+
+
+def get_popular_ids(db: Session, category: Optional[int] = None, skip: int = 0, limit: int = 100) -> List[int]:
+    """
+    IDs of the most popular properties, of the category when given, in descending order of popularity
+    """
+    query = db.query(PropertyPopularity.property_id)
+    if category:
+        query = query.filter(PropertyPopularity.property_category_id == category)
+    query = query.order_by(PropertyPopularity.score.desc()).offset(skip).limit(limit)
+    return [property_id for property_id, in query]
+
+
+def rebuild(db: Session) -> None:
+    """
+    Recompute the scores of all the properties from their feedback
+    """
+    weights = get_weights()
+    feedback_type = func.upper(Feedback.feedback_type)
+    weight = case([(feedback_type == name, weight) for name, weight in weights.items()], else_=0)
+    scores = select([Property.id, Property.property_category_id, func.sum(weight * decay(Feedback.created_at))])\
+        .select_from(Feedback.__table__.join(Property.__table__))\
+        .where(feedback_type.in_(list(weights)))\
+        .group_by(Property.id)
+    db.execute(table.delete())
+    db.execute(upsert(scores))
+    db.commit()
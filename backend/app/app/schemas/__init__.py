@@ -6,12 +6,19 @@ from .amenity import Amenity, AmenityCreate, AmenityInDB, AmenityUpdate
 from .property_amenity import PropertyAmenity, PropertyAmenityCreate, PropertyAmenityInDB, PropertyAmenityUpdate, PropertyAmenityModify
 from .property_photo import PropertyPhoto, PropertyPhotoCreate, PropertyPhotoInDB, PropertyPhotoUpdate, PropertyPhotoIn, PropertyPhotoRemove
 from .property import Property, PropertyCreate, PropertyInDB, PropertyUpdate
+from .property_summary import PropertySummary
 from .favorite import Favorite, FavoriteCreate, FavoriteInDB, FavoriteUpdate
 from .feedback_type import FeedbackType
 from .feedback import Feedback, FeedbackCreate, FeedbackInDB, FeedbackUpdate, FeedbackIn
 from .gorse_feedback import GorseFeedback
 from .gorse_item import GorseItem
 from .gorse_user import GorseUser
+from .gorse_circuit import GorseCircuit
 from .property_filter import PropertyFilter
+from .property_cursor import PropertyCursor
+from .property_facets import PropertyFacets, FacetCount, PriceFacetCount
+from .property_suggestion import PropertySuggestion
+from .property_pin import PropertyPin
+from .property_cluster import PropertyCluster
 from .geometry import Geometry, Coordinates
 
@@ -0,0 +1,12 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+# State of the circuit breaker of the calls to Gorse, for monitoring
+class GorseCircuit(BaseModel):
+    state: str
+    failures: int
+    # Seconds since the circuit opened, while it is open or half open
+    open_for: Optional[float] = None
+    last_error: Optional[str] = None
@@ -45,6 +45,7 @@ class PropertyInDBBase(PropertyBase):
 # Properties to return to client
 class Property(PropertyInDBBase):
     is_favorite: bool
+    distance_km: Optional[float] = None
     owner: User
     property_category: PropertyCategory
     property_amenities: List[PropertyAmenity]
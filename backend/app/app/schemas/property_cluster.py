@@ -0,0 +1,16 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+# Properties in a cell of the map grid, aggregated for zoomed out map views
+class PropertyCluster(BaseModel):
+    # Geohash of the cell
+    cell: str
+    count: int
+    latitude: float
+    longitude: float
+    min_price: float
+    median_price: float
+    # The property, when the cluster has only one
+    property_id: Optional[int] = None
@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+import starlette.status
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, validator
+
+
+class PropertyCursor(BaseModel):
+    """Position of the last property of a page, used to continue listing after it."""
+
+    sort: str
+    key: Any
+    id: int
+
+    @validator("key")
+    def key_matches_sort(cls, v, values):
+        if "time" in values.get("sort", ""):
+            if isinstance(v, str):
+                return datetime.fromisoformat(v)
+            return v
+        return float(v)
+
+    def encode(self) -> str:
+        data = json.dumps(jsonable_encoder(self), separators=(",", ":"))
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    @classmethod
+    def decode(cls, cursor: str) -> "PropertyCursor":
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return cls(**data)
+        except Exception:
+            raise HTTPException(detail=f"{cursor} is not a valid cursor",
+                                status_code=starlette.status.HTTP_400_BAD_REQUEST)
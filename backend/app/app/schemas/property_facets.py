@@ -0,0 +1,25 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class FacetCount(BaseModel):
+    value: Optional[int]
+    count: int
+
+
+class PriceFacetCount(BaseModel):
+    min_price: float
+    max_price: float
+    count: int
+
+
+# Counts of the properties matching a filter, per value of each facet
+class PropertyFacets(BaseModel):
+    total: int
+    approximate: bool = False
+    categories: List[FacetCount] = []
+    amenities: List[FacetCount] = []
+    num_bed: List[FacetCount] = []
+    num_bath: List[FacetCount] = []
+    price: List[PriceFacetCount] = []
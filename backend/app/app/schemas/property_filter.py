@@ -4,6 +4,8 @@ import starlette.status
 from fastapi import HTTPException, Query
 from pydantic import BaseModel, Field, validator
 
+from app.core import geohash
+
 class PropertyFilter(BaseModel):
     q: Optional[str] = Query(None, title="Query string")
     min_bed: Optional[int] = Query(None, title="Minimum number of bedrooms")
@@ -14,10 +16,16 @@ class PropertyFilter(BaseModel):
     max_price: Optional[float] = Query(None, title="Maximum rent per month")
     location: Optional[str] = Query(None, title="Coordinates of location to search in an array with latitude, "
                                                   "longitude, and radius in KM respectively", example="[43.21, 42.12, 1]")
+    bbox: Optional[str] = Query(None, title="Bounding box of the map viewport to search in, with the minimum "
+                                            "longitude, minimum latitude, maximum longitude and maximum latitude "
+                                            "respectively", example="36.7,-1.35,36.9,-1.2")
+    geohash: Optional[str] = Query(None, title="Geohash of the area to search in", example="kzf0t")
     is_verified: Optional[bool] = Query(None, title="Whether the properties are verified or not")
     is_enabled: Optional[bool] = Query(True, title="Whether the properties are enabled or not")
     categories: Optional[str] = Query(None, title="Comma separated List of categories to filter", example="[2, 5, 12]")
     amenities: Optional[str] = Query(None, title="Comma separated List of amenities to filter", example="[21, 15]")
+    amenity_match: Optional[str] = Query("any", title="Whether properties must have all or any of the amenities",
+                                         enum=["any", "all"])
 
     @validator('categories', 'amenities')
     def comma_separated_list_of_ints(cls, v):
@@ -43,6 +51,13 @@ class PropertyFilter(BaseModel):
         return v
 
 
+    @validator('amenity_match')
+    def any_or_all(cls, v):
+        if v and v not in ("any", "all"):
+            raise HTTPException(detail=f"{v} Must be either any or all",
+                                status_code=starlette.status.HTTP_400_BAD_REQUEST)
+        return v
+
     @validator('location')
     def comma_separated_list_of_two_floats(cls, v):
         if v:
@@ -74,3 +89,30 @@ class PropertyFilter(BaseModel):
                 raise HTTPException(detail=f"Coordinates should be floats in the form lat,lng,radius",
                                     status_code=starlette.status.HTTP_400_BAD_REQUEST)
 
+    @validator('geohash')
+    def valid_geohash(cls, v):
+        if v:
+            v = v.lower()
+            if not geohash.is_valid(v):
+                raise HTTPException(detail=f"{v} is not a valid geohash",
+                                    status_code=starlette.status.HTTP_400_BAD_REQUEST)
+        return v
+
+    @validator('bbox')
+    def comma_separated_list_of_four_floats(cls, v):
+        if v:
+            v = v.replace(' ', '')
+            vals = [x for x in v.split(',') if x != '']
+            try:
+                min_lng, min_lat, max_lng, max_lat = [float(val) for val in vals]
+            except Exception:
+                raise HTTPException(detail="Bounding box should be floats in the form minLng,minLat,maxLng,maxLat",
+                                    status_code=starlette.status.HTTP_400_BAD_REQUEST)
+            if not (-180 <= min_lng <= max_lng <= 180):
+                raise HTTPException(status_code=starlette.status.HTTP_400_BAD_REQUEST,
+                                    detail="Longitudes must be between -180 and 180 degrees, minimum first")
+            if not (-90 <= min_lat <= max_lat <= 90):
+                raise HTTPException(status_code=starlette.status.HTTP_400_BAD_REQUEST,
+                                    detail="Latitudes must be between -90 and 90 degrees, minimum first")
+            v = ",".join(vals)
+        return v
@@ -0,0 +1,17 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+# Minimal representation of a property shown as a pin on the map
+class PropertyPin(BaseModel):
+    id: int
+    title: str
+    price: float
+    num_bed: int
+    num_bath: int
+    property_category_id: Optional[int]
+    location: tuple
+
+    class Config:
+        orm_mode = True
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+# Autocomplete suggestion, either a location name or a property title
+class PropertySuggestion(BaseModel):
+    value: str
+    kind: str
@@ -0,0 +1,36 @@
+from typing import ClassVar, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from . import User, PropertyCategory, PropertyAmenity, PropertyPhoto
+
+
+# Compact representation of a property returned by the list endpoints, with the relations included only when
+# expanded
+class PropertySummary(BaseModel):
+    summary_fields: ClassVar[Tuple[str, ...]] = ("id", "title", "price", "num_bed", "num_bath", "feature_image",
+                                                 "location", "is_favorite", "distance_km")
+    # Relations that can be expanded, with their field
+    expandable: ClassVar[Dict[str, str]] = {"owner": "owner", "category": "property_category",
+                                            "amenities": "property_amenities", "photos": "property_photos"}
+
+    id: int
+    title: str
+    price: float
+    num_bed: int
+    num_bath: int
+    feature_image: str
+    location: tuple
+    is_favorite: bool
+    distance_km: Optional[float] = None
+    owner: Optional[User] = None
+    property_category: Optional[PropertyCategory] = None
+    property_amenities: Optional[List[PropertyAmenity]] = None
+    property_photos: Optional[List[PropertyPhoto]] = None
+
+    class Config:
+        orm_mode = True
+
+    @classmethod
+    def get_fields(cls, expand: Set[str]) -> FrozenSet[str]:
+        return frozenset(cls.summary_fields).union(cls.expandable[relation] for relation in expand)
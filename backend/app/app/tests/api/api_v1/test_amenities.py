@@ -31,3 +31,17 @@ def test_read_amenity(
     assert content["title"] == item.title
     assert content["description"] == item.description
     assert content["id"] == item.id
+
+
+def test_read_amenities_not_modified(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    create_random_amenity(db)
+    response = client.get(f"{settings.API_V1_STR}/amenities/", headers=superuser_token_headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    response = client.get(
+        f"{settings.API_V1_STR}/amenities/", headers={**superuser_token_headers, "If-None-Match": etag},
+    )
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
@@ -0,0 +1,146 @@
+import csv
+import io
+import json
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from app.core import geohash
+from app.core.config import settings
+from app.tests.utils.property import create_random_property
+from app.tests.utils.utils import random_lower_string
+
+
+def test_read_property_pins(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    title = random_lower_string()
+    property = create_random_property(db, title=title, location=(-10.05, -20.05))
+    property.property_category_id = None
+    db.commit()
+    create_random_property(db, title=title, location=(-10.5, -20.05))
+    response = client.get(
+        f"{settings.API_V1_STR}/properties/map", headers=normal_user_token_headers,
+        params={"q": title, "bbox": "-20.1,-10.1,-20,-10"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert [pin["id"] for pin in content] == [property.id]
+    assert content[0]["property_category_id"] is None
+
+
+def test_read_property_pins_rejects_invalid_bbox(
+    client: TestClient, normal_user_token_headers: dict
+) -> None:
+    # Boxes crossing the antimeridian must be split by the client, as the minimum longitude comes first
+    for bbox in ("170,-10,-170,10", "20,10,20.1", "20,10,20.1,x", "20,10.1,20.1,10", "-181,10,20,10.1"):
+        response = client.get(
+            f"{settings.API_V1_STR}/properties/map", headers=normal_user_token_headers, params={"bbox": bbox},
+        )
+        assert response.status_code == 400
+    response = client.get(f"{settings.API_V1_STR}/properties/map", headers=normal_user_token_headers)
+    assert response.status_code == 400
+
+
+def test_read_property_clusters(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    title = random_lower_string()
+    for location in ((-10.011, -20.011), (-10.012, -20.013)):
+        create_random_property(db, title=title, location=location)
+    response = client.get(
+        f"{settings.API_V1_STR}/properties/clusters", headers=normal_user_token_headers,
+        params={"q": title, "bbox": "-20.5,-10.5,-20,-10", "zoom": 3},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content) == 1
+    assert content[0]["count"] == 2
+    assert len(content[0]["cell"]) == geohash.precision_for_zoom(3)
+
+
+def test_read_property_not_modified(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    property = create_random_property(db)
+    url = f"{settings.API_V1_STR}/properties/{property.id}"
+    response = client.get(url, headers=normal_user_token_headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == property.id
+    assert "last-modified" not in response.headers
+    etag = response.headers["etag"]
+    response = client.get(url, headers={**normal_user_token_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+    # Toggling the favorite changes the ETag, even once removed
+    response = client.post(f"{url}/add_favorite", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    response = client.get(url, headers={**normal_user_token_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["is_favorite"]
+    favorite_etag = response.headers["etag"]
+    response = client.post(f"{url}/remove_favorite", headers=normal_user_token_headers)
+    assert response.status_code == 200
+    response = client.get(url, headers={**normal_user_token_headers, "If-None-Match": favorite_etag})
+    assert response.status_code == 200
+    assert not response.json()["is_favorite"]
+
+    # If-Modified-Since alone is not trusted for the property
+    response = client.get(url, headers={**normal_user_token_headers,
+                                        "If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert response.status_code == 200
+
+
+def test_read_property_batch(
+    client: TestClient, normal_user_token_headers: dict, db: Session
+) -> None:
+    first = create_random_property(db)
+    second = create_random_property(db, is_enabled=False)
+    ids = f"{second.id},-1,{first.id}"
+    response = client.get(
+        f"{settings.API_V1_STR}/properties/batch", headers=normal_user_token_headers, params={"ids": ids},
+    )
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [second.id, first.id]
+
+
+def test_read_property_batch_too_large(
+    client: TestClient, normal_user_token_headers: dict
+) -> None:
+    ids = ",".join(str(id) for id in range(1, settings.PROPERTY_BATCH_MAX_SIZE + 2))
+    response = client.get(
+        f"{settings.API_V1_STR}/properties/batch", headers=normal_user_token_headers, params={"ids": ids},
+    )
+    assert response.status_code == 422
+
+
+def test_export_properties(
+    client: TestClient, superuser_token_headers: dict, db: Session
+) -> None:
+    title = random_lower_string()
+    properties = [create_random_property(db, title=title) for _ in range(2)]
+    response = client.get(
+        f"{settings.API_V1_STR}/properties/export", headers=superuser_token_headers, params={"q": title},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [property.id for property in properties]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/properties/export", headers=superuser_token_headers,
+        params={"q": title, "format": "csv"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in rows] == [property.id for property in properties]
+    assert rows[0]["amenity_ids"] == ""
+
+
+def test_export_properties_requires_superuser(
+    client: TestClient, normal_user_token_headers: dict
+) -> None:
+    response = client.get(f"{settings.API_V1_STR}/properties/export", headers=normal_user_token_headers)
+    assert response.status_code == 400
@@ -0,0 +1,30 @@
+import time
+
+from app.core.cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    cache = LRUCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_lru_cache_expires_entries() -> None:
+    cache = LRUCache()
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_lru_cache_versions_are_not_evicted() -> None:
+    cache = LRUCache(maxsize=1)
+    assert cache.get_version("properties") == 0
+    cache.bump_version("properties")
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get_version("properties") == 1
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from starlette.requests import Request
+
+from app.api import conditional
+
+
+def make_request(**headers: str) -> Request:
+    return Request({"type": "http", "headers": [(key.replace("_", "-").encode(), value.encode())
+                                                for key, value in headers.items()]})
+
+
+def test_is_not_modified_by_etag() -> None:
+    headers = conditional.get_validators((1, 2))
+    assert conditional.is_not_modified(make_request(if_none_match=headers["ETag"]), headers)
+    assert conditional.is_not_modified(make_request(if_none_match=f'"x", {headers["ETag"][2:]}'), headers)
+    assert not conditional.is_not_modified(make_request(if_none_match='"x"'), headers)
+    assert not conditional.is_not_modified(make_request(), headers)
+
+
+def test_is_not_modified_by_date() -> None:
+    headers = conditional.get_validators((1, 2), datetime(2022, 1, 2, 3, 4, 5, 600))
+    assert headers["Last-Modified"] == "Sun, 02 Jan 2022 03:04:05 GMT"
+    assert conditional.is_not_modified(make_request(if_modified_since="Sun, 02 Jan 2022 03:04:05 GMT"), headers)
+    assert not conditional.is_not_modified(make_request(if_modified_since="Sun, 02 Jan 2022 03:04:04 GMT"), headers)
+    assert not conditional.is_not_modified(make_request(if_modified_since="garbage"), headers)
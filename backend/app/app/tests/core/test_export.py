@@ -0,0 +1,22 @@
+import json
+
+from app.core import export
+
+
+def test_to_ndjson() -> None:
+    rows = [{"id": id, "title": f"Property {id}"} for id in range(5)]
+    chunks = list(export.to_ndjson(iter(rows), batch_size=2))
+    assert len(chunks) == 3
+    assert [json.loads(line) for line in b"".join(chunks).decode().splitlines()] == rows
+
+
+def test_to_csv() -> None:
+    rows = [{"id": id, "title": f"Property, {id}"} for id in range(3)]
+    content = b"".join(export.to_csv(iter(rows), ["id", "title"], batch_size=2)).decode()
+    assert content.splitlines() == ["id,title", '0,"Property, 0"', '1,"Property, 1"', '2,"Property, 2"']
+
+
+def test_to_csv_joins_lists() -> None:
+    rows = [{"id": 1, "amenity_ids": [1, 2]}, {"id": 2, "amenity_ids": []}]
+    content = b"".join(export.to_csv(iter(rows), ["id", "amenity_ids"])).decode()
+    assert content.splitlines() == ["id,amenity_ids", "1,1;2", "2,"]
@@ -0,0 +1,29 @@
+from app.core import geohash
+
+
+def test_encode() -> None:
+    assert geohash.encode(57.64911, 10.40744, precision=11) == "u4pruydqqvj"
+    assert geohash.encode(-1.2921, 36.8219, precision=5) == "kzf0t"
+
+
+def test_is_valid() -> None:
+    assert geohash.is_valid("kzf0t")
+    assert not geohash.is_valid("kzfa")
+    assert not geohash.is_valid("")
+
+
+def test_precision_for_zoom() -> None:
+    assert geohash.precision_for_zoom(0) == 1
+    assert geohash.precision_for_zoom(10) == 5
+    assert geohash.cell_size(geohash.precision_for_zoom(10))[1] <= 360 / (2 ** 10) / 4
+
+
+def test_precision_for_zoom_grows_with_the_zoom() -> None:
+    precisions = [geohash.precision_for_zoom(zoom) for zoom in range(23)]
+    assert precisions == sorted(precisions)
+    assert precisions[-1] <= geohash.MAX_PRECISION
+    for zoom, precision in enumerate(precisions):
+        # About 4 cells or more across each tile, and fewer than 32 with the next coarser precision
+        assert geohash.cell_size(precision)[1] <= 360 / (2 ** zoom) / 4 or precision == geohash.MAX_PRECISION
+        if precision > 1:
+            assert geohash.cell_size(precision - 1)[1] > 360 / (2 ** zoom) / 4
@@ -0,0 +1,42 @@
+import json
+from datetime import datetime
+from types import SimpleNamespace
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from app import schemas
+from app.core import serialization
+from app.db.sample_data import make_property_page
+
+
+class Child(BaseModel):
+    name: str
+
+
+class Parent(BaseModel):
+    id: int
+    created_at: datetime
+    child: Optional[Child] = None
+    children: List[Child]
+
+
+def test_extractor_reads_nested_fields() -> None:
+    created_at = datetime(2022, 1, 2, 3, 4, 5)
+    parent = SimpleNamespace(id=1, created_at=created_at, child=None, children=[SimpleNamespace(name="a")])
+    data = serialization.get_extractor(Parent)(parent)
+    assert data == {"id": 1, "created_at": created_at, "child": None, "children": [{"name": "a"}]}
+    assert json.loads(serialization.dumps(data))["created_at"] == created_at.isoformat()
+
+
+def test_extractor_only_reads_given_fields() -> None:
+    parent = SimpleNamespace(id=1)
+    assert serialization.get_extractor(Parent, frozenset({"id"}))(parent) == {"id": 1}
+
+
+def test_fast_serialization_matches_validated() -> None:
+    properties = make_property_page()
+    validated = jsonable_encoder([schemas.Property.from_orm(property) for property in properties])
+    extract = serialization.get_extractor(schemas.Property)
+    assert json.loads(serialization.dumps([extract(property) for property in properties])) == validated
@@ -0,0 +1,335 @@
+import math
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core import geohash
+from app.db.session import engine
+from app.schemas.favorite import FavoriteCreate
+from app.schemas.property_amenity import PropertyAmenityCreate
+from app.schemas.property_cursor import PropertyCursor
+from app.schemas.property_filter import PropertyFilter
+from app.schemas.property_photo import PropertyPhotoCreate
+from app.tests.utils.amenity import create_random_amenity
+from app.tests.utils.property import create_random_property
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+@contextmanager
+def count_statements() -> Iterator[List[str]]:
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # type: ignore
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def test_get_many_ordered(db: Session) -> None:
+    user = create_random_user(db)
+    first = create_random_property(db)
+    second = create_random_property(db)
+    third = create_random_property(db)
+    ids = [third.id, first.id, second.id]
+    properties = crud.property.get_many_ordered(db=db, ids=ids, user_id=user.id)
+    assert [property.id for property in properties] == ids
+
+
+def test_get_many_ordered_drops_missing_and_disabled(db: Session) -> None:
+    user = create_random_user(db)
+    enabled = create_random_property(db)
+    disabled = create_random_property(db, is_enabled=False)
+    ids = [disabled.id, -1, enabled.id]
+    properties = crud.property.get_many_ordered(db=db, ids=ids, user_id=user.id)
+    assert [property.id for property in properties] == [enabled.id]
+
+
+def test_get_is_favorite_per_user(db: Session) -> None:
+    user = create_random_user(db)
+    other_user = create_random_user(db)
+    property = create_random_property(db)
+    crud.favorite.create(db=db, obj_in=FavoriteCreate(property_id=property.id, user_id=user.id))
+    assert crud.property.get(db=db, id=property.id, user_id=user.id).is_favorite
+    assert not crud.property.get(db=db, id=property.id, user_id=other_user.id).is_favorite
+
+
+def test_get_multi_with_cursor(db: Session) -> None:
+    user = create_random_user(db)
+    for _ in range(3):
+        create_random_property(db)
+    first_page = crud.property.get_multi(db=db, limit=2, user_id=user.id, sort="-time")
+    cursor = crud.property.get_cursor(first_page[-1], "-time")
+    second_page = crud.property.get_multi(db=db, limit=2, user_id=user.id, sort="-time",
+                                          cursor=PropertyCursor.decode(cursor.encode()))
+    assert second_page
+    assert not {property.id for property in first_page} & {property.id for property in second_page}
+    assert (second_page[0].created_at, second_page[0].id) < (first_page[-1].created_at, first_page[-1].id)
+
+
+def test_get_multi_cached_is_invalidated(db: Session) -> None:
+    user = create_random_user(db)
+    create_random_property(db)
+    first = crud.property.get_multi_cached(db=db, limit=5, user_id=user.id, sort="-time")
+    assert [property.id for property in crud.property.get_multi_cached(db=db, limit=5, user_id=user.id,
+                                                                       sort="-time")] == \
+        [property.id for property in first]
+    created = create_random_property(db)
+    crud.property.invalidate_search_cache()
+    properties = crud.property.get_multi_cached(db=db, limit=5, user_id=user.id, sort="-time")
+    assert properties[0].id == created.id
+
+
+def test_get_multi_amenity_match(db: Session) -> None:
+    user = create_random_user(db)
+    property = create_random_property(db)
+    first = create_random_amenity(db)
+    second = create_random_amenity(db)
+    crud.property_amenity.create(db=db, obj_in=PropertyAmenityCreate(property_id=property.id, amenity_id=first.id))
+    crud.property.update_amenity_ids(db=db, id=property.id)
+    amenities = f"{first.id},{second.id}"
+    any_match = crud.property.get_multi(db=db, user_id=user.id,
+                                        filters=PropertyFilter(amenities=amenities, amenity_match="any"))
+    all_match = crud.property.get_multi(db=db, user_id=user.id,
+                                        filters=PropertyFilter(amenities=amenities, amenity_match="all"))
+    assert [item.id for item in any_match] == [property.id]
+    assert all_match == []
+
+
+def test_get_suggestions_tolerates_typos(db: Session) -> None:
+    title = f"Kilimani {random_lower_string()}"
+    create_random_property(db, title=title)
+    suggestions = crud.property.get_suggestions(db=db, q=title[:12].replace("Kilimani", "Kilimny"), limit=50)
+    assert title in [suggestion.value for suggestion in suggestions]
+
+
+def test_summarize_only_sets_expanded_relations(db: Session) -> None:
+    user = create_random_user(db)
+    property = create_random_property(db)
+    properties = crud.property.get_many_ordered(db=db, ids=[property.id], user_id=user.id, expand={"owner"})
+    summary = crud.property.summarize(properties, {"owner"})[0]
+    assert summary.id == property.id
+    assert summary.owner.id == property.owner_id
+    assert summary.dict(exclude_unset=True).keys().isdisjoint({"property_photos", "property_amenities",
+                                                               "property_category"})
+
+
+def test_get_many_ordered_skips_duplicates(db: Session) -> None:
+    user = create_random_user(db)
+    first = create_random_property(db)
+    second = create_random_property(db, is_enabled=False)
+    properties = crud.property.get_many_ordered(db=db, ids=[second.id, first.id, second.id], user_id=user.id,
+                                                enabled_only=False)
+    assert [property.id for property in properties] == [second.id, first.id]
+
+
+def test_get_total_counts_selective_filters_exactly(db: Session) -> None:
+    title = random_lower_string()
+    create_random_property(db, title=title)
+    total, exact = crud.property.get_total(db=db, filters=PropertyFilter(q=title))
+    assert exact
+    assert total == 1
+
+
+def test_get_facets_count_the_filtered_properties(db: Session) -> None:
+    title = random_lower_string()
+    properties = [create_random_property(db, title=title) for _ in range(3)]
+    first = create_random_amenity(db)
+    second = create_random_amenity(db)
+    for property, amenities in zip(properties, ([first, second], [first], [])):
+        for amenity in amenities:
+            crud.property_amenity.create(db=db, obj_in=PropertyAmenityCreate(property_id=property.id,
+                                                                             amenity_id=amenity.id))
+        crud.property.update_amenity_ids(db=db, id=property.id)
+    facets = crud.property.get_facets(db=db, filters=PropertyFilter(q=title), price_bucket_size=1000)
+    assert facets.total == 3
+    assert {count.value: count.count for count in facets.amenities} == {first.id: 2, second.id: 1}
+    assert {count.value: count.count for count in facets.categories} == \
+        Counter(property.property_category_id for property in properties)
+    assert {count.value: count.count for count in facets.num_bed} == \
+        Counter(property.num_bed for property in properties)
+    assert {count.value: count.count for count in facets.num_bath} == \
+        Counter(property.num_bath for property in properties)
+    assert {count.min_price: count.count for count in facets.price} == \
+        Counter(math.floor(property.price / 1000) * 1000 for property in properties)
+
+
+def test_get_facets_without_matches(db: Session) -> None:
+    facets = crud.property.get_facets(db=db, filters=PropertyFilter(q=random_lower_string()))
+    assert facets.total == 0
+    assert facets.categories == facets.amenities == facets.num_bed == facets.num_bath == facets.price == []
+
+
+def test_get_pins_in_bbox(db: Session) -> None:
+    title = random_lower_string()
+    inside = create_random_property(db, title=title, location=(10.05, 20.05))
+    create_random_property(db, title=title, location=(10.5, 20.05))
+    create_random_property(db, title=title, location=(10.05, 20.5))
+    pins = crud.property.get_pins(db=db, filters=PropertyFilter(q=title, bbox="20,10,20.1,10.1"))
+    assert [pin.id for pin in pins] == [inside.id]
+    assert pins[0].location == (10.05, 20.05)
+
+
+def test_get_clusters_per_cell(db: Session) -> None:
+    title = random_lower_string()
+    locations = [(10.011, 20.011), (10.012, 20.013), (10.3, 20.3)]
+    properties = [create_random_property(db, title=title, location=location) for location in locations]
+    precision = geohash.precision_for_zoom(10)
+    cells = [geohash.encode(*location, precision=precision) for location in locations]
+    assert cells[0] == cells[1] != cells[2]
+    clusters = crud.property.get_clusters(db=db, filters=PropertyFilter(q=title, bbox="20,10,20.5,10.5"), zoom=10)
+    clusters = {cluster.cell: cluster for cluster in clusters}
+    assert {cell: cluster.count for cell, cluster in clusters.items()} == {cells[0]: 2, cells[2]: 1}
+    assert clusters[cells[0]].property_id is None
+    assert clusters[cells[0]].min_price == min(properties[0].price, properties[1].price)
+    assert clusters[cells[0]].latitude == pytest.approx(10.0115)
+    assert clusters[cells[2]].property_id == properties[2].id
+
+
+def test_get_clusters_skips_properties_without_geohash(db: Session) -> None:
+    title = random_lower_string()
+    property = create_random_property(db, title=title, location=(10.011, 20.011))
+    property.geohash = None
+    db.commit()
+    create_random_property(db, title=title, location=(10.012, 20.013))
+    clusters = crud.property.get_clusters(db=db, filters=PropertyFilter(q=title, bbox="20,10,20.5,10.5"), zoom=10)
+    assert [cluster.count for cluster in clusters] == [1]
+
+
+def test_get_multi_within_radius(db: Session) -> None:
+    user = create_random_user(db)
+    title = random_lower_string()
+    # A hundredth of a degree of latitude is about 1.1 km
+    near = create_random_property(db, title=title, location=(30.01, 40))
+    nearer = create_random_property(db, title=title, location=(30.005, 40))
+    create_random_property(db, title=title, location=(30.05, 40))
+    properties = crud.property.get_multi(db=db, user_id=user.id, filters=PropertyFilter(q=title, location="30,40,3"))
+    assert {property.id for property in properties} == {near.id, nearer.id}
+
+
+def test_get_multi_sorted_by_distance(db: Session) -> None:
+    user = create_random_user(db)
+    title = random_lower_string()
+    far = create_random_property(db, title=title, location=(30.05, 40))
+    near = create_random_property(db, title=title, location=(30.01, 40))
+    nearer = create_random_property(db, title=title, location=(30.005, 40))
+    properties = crud.property.get_multi(db=db, user_id=user.id, filters=PropertyFilter(q=title), sort="distance",
+                                         sort_latitude=30, sort_longitude=40)
+    assert [property.id for property in properties] == [nearer.id, near.id, far.id]
+    # A degree of latitude is about 110.9 km at this latitude
+    assert [property.distance_km for property in properties] == \
+        pytest.approx([0.5545, 1.109, 5.545], rel=1e-2)
+    properties = crud.property.get_multi(db=db, user_id=user.id, filters=PropertyFilter(q=title), sort="-distance",
+                                         sort_latitude=30, sort_longitude=40)
+    assert [property.id for property in properties] == [far.id, near.id, nearer.id]
+
+
+def test_get_multi_by_relevance(db: Session) -> None:
+    user = create_random_user(db)
+    word = random_lower_string()
+    once = create_random_property(db, title=f"{word} apartment")
+    twice = create_random_property(db, title=f"{word} apartment, {word} view")
+    properties = crud.property.get_multi(db=db, user_id=user.id, filters=PropertyFilter(q=word), sort="relevance")
+    assert [property.id for property in properties] == [twice.id, once.id]
+    assert properties[0].rank > properties[1].rank
+
+
+def test_get_multi_matches_last_word_as_prefix(db: Session) -> None:
+    user = create_random_user(db)
+    word = random_lower_string()
+    property = create_random_property(db, title=f"{word} apartment")
+    create_random_property(db, title=f"{word} bungalow")
+    properties = crud.property.get_multi(db=db, user_id=user.id, filters=PropertyFilter(q=f"{word} apar"))
+    assert [item.id for item in properties] == [property.id]
+    # Only the last word is a prefix
+    assert crud.property.get_multi(db=db, user_id=user.id, filters=PropertyFilter(q=f"apar {word}")) == []
+
+
+def test_get_multi_by_relevance_with_cursor_and_tied_ranks(db: Session) -> None:
+    user = create_random_user(db)
+    word = random_lower_string()
+    ids = {create_random_property(db, title=f"{word} apartment").id for _ in range(3)}
+    filters = PropertyFilter(q=word)
+    first_page = crud.property.get_multi(db=db, limit=2, user_id=user.id, filters=filters, sort="relevance")
+    assert first_page[0].rank == first_page[1].rank
+    cursor = PropertyCursor.decode(crud.property.get_cursor(first_page[-1], "relevance").encode())
+    second_page = crud.property.get_multi(db=db, limit=2, user_id=user.id, filters=filters, sort="relevance",
+                                          cursor=cursor)
+    assert len(second_page) == 1
+    assert {property.id for property in first_page + second_page} == ids
+
+
+def test_get_multi_with_price_cursor(db: Session) -> None:
+    user = create_random_user(db)
+    title = random_lower_string()
+    ids = {create_random_property(db, title=title).id for _ in range(3)}
+    filters = PropertyFilter(q=title)
+    first_page = crud.property.get_multi(db=db, limit=2, user_id=user.id, filters=filters, sort="price")
+    cursor = PropertyCursor.decode(crud.property.get_cursor(first_page[-1], "price").encode())
+    second_page = crud.property.get_multi(db=db, limit=2, user_id=user.id, filters=filters, sort="price",
+                                          cursor=cursor)
+    assert len(second_page) == 1
+    assert {property.id for property in first_page + second_page} == ids
+    assert (first_page[-1].price, first_page[-1].id) < (second_page[0].price, second_page[0].id)
+
+
+def test_get_multi_with_distance_cursor(db: Session) -> None:
+    user = create_random_user(db)
+    title = random_lower_string()
+    locations = [(30.005, 40), (30.01, 40), (29.98, 40)]
+    ids = [create_random_property(db, title=title, location=location).id for location in locations]
+    filters = PropertyFilter(q=title)
+    first_page = crud.property.get_multi(db=db, limit=2, user_id=user.id, filters=filters, sort="distance",
+                                         sort_latitude=30, sort_longitude=40)
+    cursor = PropertyCursor.decode(crud.property.get_cursor(first_page[-1], "distance").encode())
+    second_page = crud.property.get_multi(db=db, limit=2, user_id=user.id, filters=filters, sort="distance",
+                                          sort_latitude=30, sort_longitude=40, cursor=cursor)
+    assert len(second_page) == 1
+    assert [property.id for property in first_page + second_page] == ids
+
+
+@pytest.mark.parametrize("loader_strategy", ["selectin", "joined"])
+def test_page_costs_constant_number_of_statements(db: Session, loader_strategy: str) -> None:
+    owner = create_random_user(db)
+    title = random_lower_string()
+    amenity = create_random_amenity(db)
+    for _ in range(4):
+        property = create_random_property(db, owner_id=owner.id, title=title)
+        crud.property_amenity.create(db=db, obj_in=PropertyAmenityCreate(property_id=property.id,
+                                                                         amenity_id=amenity.id))
+        crud.property.update_amenity_ids(db=db, id=property.id)
+        crud.property_photo.create(db=db, obj_in=PropertyPhotoCreate(property_id=property.id,
+                                                                     photo=random_lower_string()))
+        crud.favorite.create(db=db, obj_in=FavoriteCreate(property_id=property.id, user_id=owner.id))
+    owner_id = owner.id
+    expand = {"owner", "category", "amenities", "photos"}
+    getters = [
+        lambda limit: crud.property.get_multi(db=db, limit=limit, user_id=owner_id, filters=PropertyFilter(q=title),
+                                              loader_strategy=loader_strategy),
+        lambda limit: crud.property.get_multi_by_owner(db=db, owner_id=owner_id, limit=limit,
+                                                       loader_strategy=loader_strategy),
+        lambda limit: crud.property.get_favorite_by_owner(db=db, owner_id=owner_id, limit=limit,
+                                                          loader_strategy=loader_strategy),
+    ]
+    for get_page in getters:
+        counts = []
+        for limit in (1, 4):
+            # Expire the loaded rows so that their relations are loaded again rather than taken from the session
+            db.expire_all()
+            with count_statements() as statements:
+                properties = get_page(limit)
+                crud.property.summarize(properties, expand)
+            assert len(properties) == limit
+            counts.append(len(statements))
+        assert counts[0] == counts[1]
+        if loader_strategy == "joined":
+            assert counts[0] == 1
@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+
+from app.recommend import gorse
+from app.recommend.breaker import BreakerState, CircuitBreaker
+
+
+def test_opens_after_consecutive_failures() -> None:
+    breaker = CircuitBreaker(failure_threshold=3, slow_call_duration=1, reset_timeout=30)
+    breaker.record_failure("down")
+    breaker.record_failure("down")
+    breaker.record_success(0.1)
+    breaker.record_failure("down")
+    breaker.record_failure("down")
+    assert breaker.state == BreakerState.CLOSED
+    breaker.record_success(2)
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow()
+    assert not breaker.start_probe()
+
+
+def test_probe_closes_the_circuit() -> None:
+    calls = list()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            raise httpx.ConnectError("", request=request)
+        return httpx.Response(200, json=[])
+
+    breaker = CircuitBreaker(failure_threshold=1, slow_call_duration=1, reset_timeout=0)
+    client = gorse.AsyncClient(breaker=breaker, transport=httpx.MockTransport(handler))
+
+    async def run() -> None:
+        assert await gorse.get_popular_items(limit=1, client=client) is None
+        assert breaker.state == BreakerState.HALF_OPEN
+        # Served straight away while the probe runs in the background
+        assert await gorse.get_popular_items(limit=1, client=client) is None
+        await asyncio.gather(*client.probes)
+
+    asyncio.run(run())
+    assert calls == ["/api/popular", "/api/latest"]
+    assert breaker.state == BreakerState.CLOSED
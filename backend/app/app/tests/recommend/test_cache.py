@@ -0,0 +1,48 @@
+import asyncio
+from typing import Any, List
+
+from app.recommend.cache import RecommendationCache
+
+
+def make_fetch(calls: List[int], value: Any = "value") -> Any:
+    async def fetch() -> Any:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return value
+    return fetch
+
+
+def test_coalesces_concurrent_misses() -> None:
+    cache = RecommendationCache(ttl=60)
+    calls: List[int] = list()
+
+    async def run() -> List[Any]:
+        return await asyncio.gather(*[cache.get("key", make_fetch(calls)) for _ in range(5)])
+
+    assert asyncio.run(run()) == ["value"] * 5
+    assert len(calls) == 1
+
+
+def test_serves_stale_while_refreshing() -> None:
+    cache = RecommendationCache(ttl=0, stale_ttl=60)
+    calls: List[int] = list()
+
+    async def run() -> List[Any]:
+        first = await cache.get("key", make_fetch(calls, "old"))
+        stale = await cache.get("key", make_fetch(calls, "new"))
+        await asyncio.sleep(0.05)
+        return [first, stale, cache.entries["key"][1]]
+
+    assert asyncio.run(run()) == ["old", "old", "new"]
+    assert len(calls) == 2
+
+
+def test_does_not_cache_failures() -> None:
+    cache = RecommendationCache(ttl=60)
+    calls: List[int] = list()
+
+    async def run() -> List[Any]:
+        return [await cache.get("key", make_fetch(calls, None)), await cache.get("key", make_fetch(calls))]
+
+    assert asyncio.run(run()) == [None, "value"]
+    assert len(calls) == 2
@@ -0,0 +1,34 @@
+import asyncio
+
+import httpx
+
+from app.recommend import gorse
+
+
+def test_map_error() -> None:
+    request = httpx.Request("GET", "http://gorse/api/latest")
+    assert isinstance(gorse.map_error(httpx.ReadTimeout("", request=request), "latest"), gorse.GorseTimeoutError)
+    assert isinstance(gorse.map_error(httpx.ConnectError("", request=request), "latest"),
+                      gorse.GorseUnavailableError)
+    not_found = httpx.HTTPStatusError("", request=request, response=httpx.Response(404, request=request))
+    assert isinstance(gorse.map_error(not_found, "latest"), gorse.GorseRequestError)
+
+
+def test_sync_client_returns_none_on_failure() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/latest"):
+            return httpx.Response(200, json=[{"Id": "1", "Score": 1}])
+        raise httpx.ConnectTimeout("", request=request)
+
+    client = gorse.SyncClient(transport=httpx.MockTransport(handler))
+    assert gorse.get_latest_items(limit=1, client=client) == [{"Id": "1", "Score": 1}]
+    assert gorse.get_popular_items(limit=1, client=client) is None
+
+
+def test_async_client() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(500) if "popular" in request.url.path else httpx.Response(200, json=["1", "2"])
+
+    client = gorse.AsyncClient(transport=httpx.MockTransport(handler))
+    assert asyncio.run(gorse.get_item_neighbors(item_id=1, limit=2, client=client)) == ["1", "2"]
+    assert asyncio.run(gorse.get_popular_items(limit=2, client=client)) is None
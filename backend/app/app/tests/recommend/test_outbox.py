@@ -0,0 +1,77 @@
+from typing import List
+
+import httpx
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.recommend import gorse, outbox
+from app.schemas.favorite import FavoriteCreate
+from app.tests.utils.property import create_random_property
+from app.tests.utils.user import create_random_user
+
+
+def get_rows(db: Session, key: str) -> List[models.GorseOutbox]:
+    return db.query(models.GorseOutbox).filter(models.GorseOutbox.key == key).order_by(models.GorseOutbox.id).all()
+
+
+def test_changes_are_recorded(db: Session) -> None:
+    user = create_random_user(db)
+    property = create_random_property(db)
+    crud.favorite.create(db=db, obj_in=FavoriteCreate(property_id=property.id, user_id=user.id))
+    crud.favorite.delete_by_property_id_and_user_id(db=db, property_id=property.id, user_id=user.id)
+    assert [row.action for row in get_rows(db, f"user:{user.id}")] == ["user.upsert"]
+    assert "item.upsert" in [row.action for row in get_rows(db, f"item:{property.id}")]
+    assert [row.action for row in get_rows(db, f"feedback:favorite:{user.id}:{property.id}")] == ["feedback.delete"]
+
+
+def test_drain_retries_when_gorse_is_unavailable(db: Session, monkeypatch) -> None:
+    property = create_random_property(db)
+    key = f"item:{property.id}"
+
+    def unavailable(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("", request=request)
+
+    monkeypatch.setattr(outbox, "client", gorse.SyncClient(raise_errors=True,
+                                                           transport=httpx.MockTransport(unavailable)))
+    while outbox.drain(db):
+        pass
+    rows = get_rows(db, key)
+    assert rows and rows[0].attempts == 1
+
+    sent = list()
+
+    def available(request: httpx.Request) -> httpx.Response:
+        sent.append(request.url.path)
+        return httpx.Response(200, json={"RowAffected": 1})
+
+    monkeypatch.setattr(outbox, "client", gorse.SyncClient(raise_errors=True,
+                                                           transport=httpx.MockTransport(available)))
+    db.query(models.GorseOutbox).filter(models.GorseOutbox.key == key)\
+        .update({models.GorseOutbox.next_attempt_at: models.GorseOutbox.created_at}, synchronize_session=False)
+    db.commit()
+    while outbox.drain(db):
+        pass
+    assert not get_rows(db, key)
+    assert "/api/items" in sent
+
+
+def test_drain_keeps_the_rejected_rows(db: Session, monkeypatch) -> None:
+    properties = [create_random_property(db) for _ in range(3)]
+    for property in properties:
+        crud.property.remove(db=db, id=property.id)
+    rejected = f"/api/item/{properties[1].id}"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.method == "DELETE" and request.url.path == rejected:
+            return httpx.Response(400)
+        return httpx.Response(200, json={"RowAffected": 1})
+
+    monkeypatch.setattr(outbox, "client", gorse.SyncClient(raise_errors=True,
+                                                           transport=httpx.MockTransport(handler)))
+    while outbox.drain(db):
+        pass
+    assert not get_rows(db, f"item:{properties[0].id}")
+    assert not get_rows(db, f"item:{properties[2].id}")
+    rows = get_rows(db, f"item:{properties[1].id}")
+    assert [row.action for row in rows] == ["item.delete"]
+    assert rows[0].failed_at is not None
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.recommend import popularity
+from app.schemas.feedback import FeedbackCreate
+from app.schemas.feedback_type import FeedbackType
+from app.tests.utils.property import create_random_property
+from app.tests.utils.user import create_random_user
+
+
+def get_score(db: Session, property_id: int) -> float:
+    row = db.query(models.PropertyPopularity).get(property_id)
+    db.refresh(row)
+    return row.score
+
+
+def test_feedback_updates_popularity(db: Session) -> None:
+    user = create_random_user(db)
+    viewed = create_random_property(db)
+    favorite = create_random_property(db)
+    crud.feedback.create(db=db, obj_in=FeedbackCreate(property_id=viewed.id, user_id=user.id,
+                                                      feedback_type=FeedbackType.VIEW))
+    crud.feedback.create(db=db, obj_in=FeedbackCreate(property_id=favorite.id, user_id=user.id,
+                                                      feedback_type=FeedbackType.FAVORITE))
+    view_score = get_score(db, viewed.id)
+    assert get_score(db, favorite.id) == pytest.approx(5 * view_score, rel=1e-3)
+    crud.feedback.create(db=db, obj_in=FeedbackCreate(property_id=viewed.id, user_id=user.id,
+                                                      feedback_type=FeedbackType.VIEW))
+    assert get_score(db, viewed.id) == pytest.approx(2 * view_score, rel=1e-3)
+
+    popular_ids = popularity.get_popular_ids(db, category=favorite.property_category_id)
+    assert popular_ids == [favorite.id]
+
+
+def test_rebuild_matches_incremental_scores(db: Session) -> None:
+    user = create_random_user(db)
+    property = create_random_property(db)
+    for feedback_type in (FeedbackType.VIEW, FeedbackType.CALL, FeedbackType.SHARE):
+        crud.feedback.create(db=db, obj_in=FeedbackCreate(property_id=property.id, user_id=user.id,
+                                                          feedback_type=feedback_type))
+    # Feedback types are matched regardless of their case
+    db.add(models.Feedback(property_id=property.id, user_id=user.id, feedback_type="favorite"))
+    db.commit()
+    score = get_score(db, property.id)
+    popularity.rebuild(db)
+    assert get_score(db, property.id) == pytest.approx(score, rel=1e-3)
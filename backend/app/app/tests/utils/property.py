@@ -0,0 +1,26 @@
+import random
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.schemas.property import PropertyCreate
+from app.tests.utils.category import create_random_property_category
+from app.tests.utils.user import create_random_user
+from app.tests.utils.utils import random_lower_string
+
+
+def create_random_property(db: Session, *, owner_id: Optional[int] = None, title: Optional[str] = None,
+                           is_enabled: bool = True,
+                           location: Optional[Tuple[float, float]] = None) -> models.Property:
+    if owner_id is None:
+        user = create_random_user(db)
+        owner_id = user.id
+    category = create_random_property_category(db)
+    item_in = PropertyCreate(property_category_id=category.id, title=title or random_lower_string(),
+                             description=random_lower_string(), num_bed=random.randint(0, 5),
+                             num_bath=random.randint(0, 5), location_name=random_lower_string(),
+                             price=random.randint(100, 100000),
+                             location=location or (random.uniform(-1.5, -1.0), random.uniform(36.5, 37.0)),
+                             is_enabled=is_enabled, feature_image="https://example.com/feature.png")
+    return crud.property.create_with_owner(db=db, obj_in=item_in, owner_id=owner_id)
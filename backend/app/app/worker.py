@@ -2,6 +2,8 @@ from raven import Client
 
 from app.core.celery_app import celery_app
 from app.core.config import settings
+from app.db.session import SessionLocal
+from app.recommend import outbox
 
 client_sentry = Client(settings.SENTRY_DSN)
 
@@ -9,3 +11,20 @@ client_sentry = Client(settings.SENTRY_DSN)
 @celery_app.task(acks_late=True)
 def test_celery(word: str) -> str:
     return f"test task return {word}"
+
+
+@celery_app.task(acks_late=True, ignore_result=True)
+def drain_gorse_outbox() -> int:
+    """
+    Deliver the due changes of the Gorse outbox, batch after batch until none is left
+    """
+    db = SessionLocal()
+    try:
+        delivered = 0
+        while True:
+            count = outbox.drain(db)
+            delivered += count
+            if count < settings.GORSE_OUTBOX_BATCH_SIZE:
+                return delivered
+    finally:
+        db.close()
@@ -3,4 +3,4 @@ set -e
 
 python /app/app/celeryworker_pre_start.py
 
- celery -A app.worker worker -l info -Q main-queue -c 1
\ No newline at end of file
+ celery -A app.worker worker -B -l info -Q main-queue -c 1
\ No newline at end of file